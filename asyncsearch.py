@@ -0,0 +1,179 @@
+import asyncio
+import time
+from heapq import heappush, heappop, nsmallest
+
+import graph
+import pathfinding
+
+class AsyncNode(graph.Node):
+    """
+    Node whose neighbors come from a slow lookup, e.g. a call to a tile or adjacency store. get_neighbors is a coroutine that
+    returns the same list of Edge objects as Node.get_neighbors, with AsyncNode objects as targets. Use async_bfs and async_astar
+    to search graphs of such nodes.
+    """
+    __slots__ = ()
+    async def get_neighbors(self):
+        return []
+
+class _Fetcher:
+    """
+    Runs the get_neighbors calls of a search as asyncio tasks, at most concurrency of them at the same time. tasks holds the
+    fetches that were started but not consumed yet, keyed by get_id(), so a node that is requested again while its neighbors are
+    still being fetched (or were prefetched) shares the running task instead of starting a second lookup.
+    """
+    def __init__(self, concurrency):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.tasks = {}
+    async def _fetch(self, node):
+        async with self.semaphore:
+            return await node.get_neighbors()
+    def prefetch(self, node_id, node):
+        if node_id not in self.tasks:
+            self.tasks[node_id] = asyncio.ensure_future(self._fetch(node))
+    async def get(self, node_id, node):
+        self.prefetch(node_id, node)
+        return await self.tasks.pop(node_id)
+    def cancel(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+
+async def _async_search(start, goal, priority, improve=False, early_goal=False, prefetch=8, concurrency=4):
+    """
+    Async version of pathfinding._search. Before each node is expanded, the neighbors of the prefetch best entries of the frontier
+    are requested as well, so that up to concurrency lookups overlap with each other and with the search itself. By the heap
+    property these entries are all among the first 2**prefetch-1 entries of the frontier, so finding them does not scan the whole
+    frontier. Prefetched lookups whose node is never expanded are cancelled when the search ends.
+
+    goal and priority are plain (synchronous) functions. Returns the usual 4-tuple (path,distance,visited,expanded).
+    """
+    fetcher = _Fetcher(concurrency)
+    window = 2**prefetch - 1
+    start_id = start.get_id()
+    parents = {start_id: None}
+    costs = {start_id: 0}
+    closed = set()
+    counter = 0
+    frontier = []
+    heappush(frontier, (priority(0, start, counter), counter, 0, start))
+    visited = 1
+    expanded = 0
+    if early_goal and goal(start):
+        return [], 0, visited, expanded
+    try:
+        while frontier:
+            _, _, cost, current = heappop(frontier)
+            current_id = current.get_id()
+            if current_id in closed or cost > costs[current_id]:
+                continue
+            if not early_goal and goal(current):
+                return pathfinding._reconstruct(parents, current_id), cost, visited, expanded
+            closed.add(current_id)
+            expanded += 1
+            if prefetch:
+                for (_, _, next_cost, node) in nsmallest(prefetch, frontier[:window]):
+                    node_id = node.get_id()
+                    if node_id not in closed and next_cost <= costs[node_id]:
+                        fetcher.prefetch(node_id, node)
+            for edge in await fetcher.get(current_id, current):
+                target = edge.target
+                target_id = target.get_id()
+                if target_id in closed:
+                    continue
+                new_cost = cost + edge.cost
+                known = costs.get(target_id)
+                if known is not None and (not improve or new_cost >= known):
+                    continue
+                costs[target_id] = new_cost
+                parents[target_id] = (current_id, edge)
+                visited += 1
+                if early_goal and goal(target):
+                    return pathfinding._reconstruct(parents, target_id), new_cost, visited, expanded
+                counter += 1
+                heappush(frontier, (priority(new_cost, target, counter), counter, new_cost, target))
+        return [], 0, visited, expanded
+    finally:
+        fetcher.cancel()
+
+async def async_bfs(start, goal, prefetch=8, concurrency=4):
+    """
+    Breadth-First search over AsyncNode objects, see pathfinding.bfs. prefetch is the number of frontier entries whose
+    neighbors are requested ahead of time and concurrency the maximum number of get_neighbors calls running at the same time.
+    """
+    return await _async_search(start, goal, lambda cost, node, counter: counter, early_goal=True, prefetch=prefetch, concurrency=concurrency)
+
+async def async_astar(start, heuristic, goal, prefetch=8, concurrency=4):
+    """
+    A* search over AsyncNode objects, see pathfinding.astar. The heuristic and the goal predicate stay synchronous. prefetch and
+    concurrency are as for async_bfs. With prefetch=0 the lookups are done one at a time, like the synchronous search.
+    """
+    return await _async_search(start, goal, lambda cost, node, counter: cost + heuristic(node), improve=True, prefetch=prefetch, concurrency=concurrency)
+
+class LatencyStore:
+    """
+    Fake adjacency store for trying out the async searches: serves the edges of an in-memory graph (e.g. the result of
+    graph.make_geom_graph), but every lookup takes latency seconds, either blocking (get) or as a coroutine (async_get).
+    calls counts the lookups.
+    """
+    def __init__(self, nodes, latency=0.001):
+        self.edges = {node_id: [(edge.target.get_id(), edge.cost, edge.name) for edge in node.get_neighbors()] for (node_id, node) in nodes.items()}
+        self.latency = latency
+        self.calls = 0
+    def get(self, node_id):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.edges[node_id]
+    async def async_get(self, node_id):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.edges[node_id]
+
+class StoreNode(graph.Node):
+    """
+    Node of a LatencyStore with a blocking get_neighbors, for the synchronous searches.
+    """
+    __slots__ = ("store", "node_id")
+    def __init__(self, store, node_id):
+        self.store = store
+        self.node_id = node_id
+    def get_id(self):
+        return self.node_id
+    def get_neighbors(self):
+        return [graph.Edge(StoreNode(self.store, target), cost, name) for (target, cost, name) in self.store.get(self.node_id)]
+
+class AsyncStoreNode(AsyncNode):
+    """
+    Node of a LatencyStore with an async get_neighbors, for async_bfs and async_astar.
+    """
+    __slots__ = ("store", "node_id")
+    def __init__(self, store, node_id):
+        self.store = store
+        self.node_id = node_id
+    def get_id(self):
+        return self.node_id
+    async def get_neighbors(self):
+        return [graph.Edge(AsyncStoreNode(self.store, target), cost, name) for (target, cost, name) in await self.store.async_get(self.node_id)]
+
+def main(width=40, latency=0.002):
+    """
+    Compares the synchronous searches with the async ones on a grid graph served by a LatencyStore, printing the time and the
+    number of lookups of each.
+    """
+    import benchmark
+    nodes, start_id, target_id, heuristic = benchmark.grid_graph(width)
+    goal = lambda n: n.get_id() == target_id
+    runs = [("bfs", lambda store: pathfinding.bfs(StoreNode(store, start_id), goal)),
+            ("async_bfs", lambda store: asyncio.run(async_bfs(AsyncStoreNode(store, start_id), goal))),
+            ("astar", lambda store: pathfinding.astar(StoreNode(store, start_id), heuristic, goal)),
+            ("async_astar (prefetch=0)", lambda store: asyncio.run(async_astar(AsyncStoreNode(store, start_id), heuristic, goal, prefetch=0))),
+            ("async_astar", lambda store: asyncio.run(async_astar(AsyncStoreNode(store, start_id), heuristic, goal))),
+            ("async_astar (concurrency=16)", lambda store: asyncio.run(async_astar(AsyncStoreNode(store, start_id), heuristic, goal, prefetch=16, concurrency=16)))]
+    for (name, run) in runs:
+        store = LatencyStore(nodes, latency)
+        began = time.perf_counter()
+        path, distance, visited, expanded = run(store)
+        elapsed = time.perf_counter() - began
+        print("%-30s %7.3fs  distance %s  expanded %d  lookups %d  (%.0f expansions/s)"%(name, elapsed, distance, expanded, store.calls, expanded/elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_all_start_methods, get_context
+
+# State shared with the worker processes: set before the pool is created, so forked workers inherit it (including the
+# CSR arrays of a graph.CompactGraph, whose pages stay shared until written) instead of receiving a pickled copy per task.
+_shared = None
+
+def _init_worker(shared):
+    global _shared
+    _shared = shared
+
+def _executor(shared, workers):
+    """
+    Creates a process pool whose workers see shared as the module global _shared. With the fork start method the workers inherit it,
+    otherwise it is pickled once per worker (which requires the graph, algorithm and heuristic to be picklable).
+    """
+    global _shared
+    if "fork" in get_all_start_methods():
+        _shared = shared
+        return ProcessPoolExecutor(workers, mp_context=get_context("fork"))
+    return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shared,))
+
+def _encode(start, path):
+    """
+    Encodes a path as the positions of its edges in the get_neighbors() lists along the way, so results can be sent back from 
+    a worker without pickling the Node objects (and, for GeomNode, the whole graph reachable from them).
+    """
+    positions = []
+    node = start
+    for edge in path:
+        target_id = edge.target.get_id()
+        for (i, candidate) in enumerate(node.get_neighbors()):
+            if candidate is edge or (candidate.target.get_id() == target_id and candidate.cost == edge.cost):
+                positions.append(i)
+                break
+        node = edge.target
+    return positions
+
+def _decode(start, positions):
+    """
+    Inverse of _encode: walks from start along the given neighbor positions and returns the graph.Edge objects.
+    """
+    path = []
+    node = start
+    for i in positions:
+        edge = node.get_neighbors()[i]
+        path.append(edge)
+        node = edge.target
+    return path
+
+def _call(algorithm, start, heuristic, goal):
+    if heuristic is None:
+        return algorithm(start, goal)
+    return algorithm(start, heuristic, goal)
+
+def _run_query(start_id, goal_id):
+    nodes, algorithm, heuristic = _shared
+    start = nodes[start_id]
+    began = time.perf_counter()
+    path, distance, visited, expanded = _call(algorithm, start, heuristic, lambda n: n.get_id() == goal_id)
+    elapsed = time.perf_counter() - began
+    return _encode(start, path), distance, visited, expanded, elapsed
+
+def _run_variant(i):
+    start, goal, variants = _shared
+    _, algorithm, heuristic = variants[i]
+    began = time.perf_counter()
+    path, distance, visited, expanded = _call(algorithm, start, heuristic, goal)
+    elapsed = time.perf_counter() - began
+    return _encode(start, path), distance, visited, expanded, elapsed
+
+def batch_search(nodes, queries, algorithm, heuristic=None, workers=None):
+    """
+    Runs algorithm (e.g. pathfinding.astar) for a list of (start id, goal id) queries on a process pool with workers processes 
+    (default: one per core). nodes is a graph that can be indexed by node id, e.g. the result of graph.make_geom_graph or a 
+    graph.CompactGraph. heuristic is passed to algorithm unless it is None (for bfs and dfs).
+    
+    This is a generator that yields (start id, goal id, result, seconds) in the order in which the queries complete, where result 
+    is the usual 4-tuple (path,distance,visited,expanded) with path made of the Edge objects of nodes, and seconds the time the 
+    worker spent on the search.
+    """
+    global _shared
+    executor = _executor((nodes, algorithm, heuristic), workers)
+    try:
+        futures = {executor.submit(_run_query, start_id, goal_id): (start_id, goal_id) for (start_id, goal_id) in queries}
+        for future in as_completed(futures):
+            start_id, goal_id = futures[future]
+            positions, distance, visited, expanded, elapsed = future.result()
+            yield start_id, goal_id, (_decode(nodes[start_id], positions), distance, visited, expanded), elapsed
+    finally:
+        executor.shutdown(cancel_futures=True)
+        _shared = None
+
+def run_variants(start, goal, variants, workers=None):
+    """
+    Runs several searches from the same start node with the same goal predicate concurrently. variants is a list of 
+    (label, algorithm, heuristic) triples, heuristic being None for bfs and dfs. Yields (label, result, seconds) in completion order.
+    """
+    global _shared
+    executor = _executor((start, goal, variants), workers)
+    try:
+        futures = {executor.submit(_run_variant, i): variants[i][0] for i in range(len(variants))}
+        for future in as_completed(futures):
+            positions, distance, visited, expanded, elapsed = future.result()
+            yield futures[future], (_decode(start, positions), distance, visited, expanded), elapsed
+    finally:
+        executor.shutdown(cancel_futures=True)
+        _shared = None
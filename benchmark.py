@@ -0,0 +1,301 @@
+import argparse
+import json
+import math
+import platform
+import random
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import graph
+import pathfinding
+import profiling
+import replanning
+import vectorsearch
+
+def grid_graph(width, obstacles=0.2, seed=0):
+    """
+    width x width 4-connected grid with unit costs, where a fraction obstacles of the cells (never the corners) is blocked. 
+    Node ids are (x,y) tuples. Returns (nodes, start id, target id, heuristic) with the Manhattan distance to the target as heuristic.
+    """
+    rng = random.Random(seed)
+    free = [(x, y) for x in range(width) for y in range(width) if rng.random() >= obstacles or (x, y) in ((0, 0), (width-1, width-1))]
+    cells = set(free)
+    edges = [((x, y), (x+dx, y+dy), 1.0) for (x, y) in free for (dx, dy) in ((1, 0), (0, 1)) if (x+dx, y+dy) in cells]
+    target = (width-1, width-1)
+    heuristic = lambda n: abs(n.get_id()[0] - target[0]) + abs(n.get_id()[1] - target[1])
+    return graph.make_geom_graph(free, edges), (0, 0), target, heuristic
+
+def geometric_graph(size, degree=6, seed=0):
+    """
+    Random geometric graph: size points in the unit square, each connected to all points within the radius that gives about degree
+    neighbors on average, with the Euclidean distance as cost. Returns (nodes, start id, target id, heuristic) with the straight line
+    distance to the target as heuristic.
+    """
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(size)]
+    radius = math.sqrt(degree/(math.pi*size))
+    cells = {}
+    for (i, (x, y)) in enumerate(points):
+        cells.setdefault((int(x/radius), int(y/radius)), []).append(i)
+    edges = []
+    for (i, (x, y)) in enumerate(points):
+        cx = int(x/radius)
+        cy = int(y/radius)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in cells.get((cx+dx, cy+dy), []):
+                    if j > i and math.dist(points[i], points[j]) <= radius:
+                        edges.append((i, j, math.dist(points[i], points[j])))
+    start = min(range(size), key=lambda i: points[i][0] + points[i][1])
+    target = max(range(size), key=lambda i: points[i][0] + points[i][1])
+    heuristic = lambda n: math.dist(points[n.get_id()], points[target])
+    return graph.make_geom_graph(range(size), edges), start, target, heuristic
+
+def scale_free_graph(size, links=2, seed=0):
+    """
+    Scale-free graph grown by preferential attachment (Barabasi-Albert): every new node links to links existing nodes chosen with 
+    probability proportional to their degree, with random costs between 1 and 10. Returns (nodes, start id, target id, heuristic), 
+    the heuristic being the default one, since there is no geometry to estimate distances from.
+    """
+    rng = random.Random(seed)
+    edges = []
+    ends = list(range(links))
+    for i in range(links, size):
+        chosen = set()
+        while len(chosen) < links:
+            chosen.add(rng.choice(ends))
+        for j in chosen:
+            edges.append((i, j, float(rng.randint(1, 10))))
+            ends.extend((i, j))
+    return graph.make_geom_graph(range(size), edges), size-1, size//2, pathfinding.default_heuristic
+
+def _geom_cases(scale):
+    return [("grid", int(100*math.sqrt(scale)), grid_graph),
+            ("geometric", 20000*scale, geometric_graph),
+            ("scale-free", 20000*scale, scale_free_graph)]
+
+def _inf_cases(scale):
+    targets = [2050, 20000*scale, 200000*scale]
+    return [("infinite-simple", target) for target in targets] + [("infinite-multi", target) for target in targets]
+
+def _geom_algorithms():
+    return [("bfs", lambda start, h, goal, stats=None: pathfinding.bfs(start, goal, stats)),
+            ("dfs", lambda start, h, goal, stats=None: pathfinding.dfs(start, goal, stats)),
+            ("greedy", pathfinding.greedy),
+            ("astar (default heuristic)", lambda start, h, goal, stats=None: pathfinding.astar(start, pathfinding.default_heuristic, goal, stats)),
+            ("astar", pathfinding.astar),
+            ("astar (compact)", pathfinding.astar)]
+
+def _case(kind, size, algorithm, repeat):
+    """
+    Builds the graph of one benchmark case and runs one algorithm on it repeat times. Returns the measurements as a dictionary,
+    seconds being the fastest of the runs. One more, untimed run with a profiling.SearchStats provides the peak frontier size and
+    the per-phase counters.
+    """
+    if kind.startswith("infinite"):
+        start = graph.InfNode(1)
+        if kind == "infinite-simple":
+            heuristic = lambda n: abs(n.get_id() - size)
+            goal = lambda n: n.get_id() == size
+        else:
+            heuristic = lambda n: abs(n.get_id()%123 - 63)
+            goal = lambda n: n.get_id() > size and n.get_id()%123 == 63
+        if algorithm == "bfs (vector)":
+            goal = (lambda n: n == size) if kind == "infinite-simple" else (lambda n: (n > size) & (n%123 == 63))
+        run = dict(_inf_algorithms())[algorithm]
+    else:
+        generator = dict((name, generator) for (name, _, generator) in _geom_cases(1))[kind]
+        nodes, start_id, target_id, heuristic = generator(size)
+        start = nodes[start_id]
+        if algorithm.endswith("(compact)"):
+            start = graph.CompactGraph.from_graph(nodes)[start_id]
+        goal = lambda n: n.get_id() == target_id
+        run = dict(_geom_algorithms())[algorithm]
+    seconds = None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        path, distance, visited, expanded = run(start, heuristic, goal)
+        elapsed = time.perf_counter() - began
+        if seconds is None or elapsed < seconds:
+            seconds = elapsed
+    stats = profiling.SearchStats()
+    run(start, heuristic, goal, stats)
+    return {"case": kind, "size": size, "algorithm": algorithm, "seconds": seconds,
+            "nodes_per_second": expanded/seconds if seconds > 0 else None,
+            "peak_frontier": stats.peak_frontier, "profile": stats.as_dict(), "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "distance": distance, "path_length": len(path), "visited": visited, "expanded": expanded}
+
+def _inf_algorithms():
+    return [("bfs", lambda start, h, goal, stats=None: pathfinding.bfs(start, goal, stats)),
+            ("bfs (vector)", lambda start, h, goal, stats=None: vectorsearch.vector_bfs(start, goal, stats=stats)),
+            ("greedy", pathfinding.greedy),
+            ("astar (default heuristic)", lambda start, h, goal, stats=None: pathfinding.astar(start, pathfinding.default_heuristic, goal, stats)),
+            ("astar", pathfinding.astar)]
+
+def cases(scale=1):
+    """
+    Lists all benchmark cases at the given scale as (case, size, algorithm) triples. DFS is left out on the infinite graph, where it never terminates.
+    """
+    result = []
+    for (kind, size, _) in _geom_cases(scale):
+        result.extend((kind, size, algorithm) for (algorithm, _) in _geom_algorithms())
+    for (kind, size) in _inf_cases(scale):
+        result.extend((kind, size, algorithm) for (algorithm, _) in _inf_algorithms())
+    return result
+
+def run(scale=1, repeat=3, verbose=True):
+    """
+    Runs all benchmark cases, each in a fresh worker process so that peak_rss_kb is the peak of that case alone. 
+    Returns the results as a dictionary that can be written as JSON.
+    """
+    results = []
+    for (kind, size, algorithm) in cases(scale):
+        with ProcessPoolExecutor(1, mp_context=get_context("fork")) as executor:
+            result = executor.submit(_case, kind, size, algorithm, repeat).result()
+        results.append(result)
+        if verbose:
+            print("%-16s %8s %-26s %8.3fs %12.0f nodes/s expanded %8d frontier %8d rss %8d kB"%(kind, size, algorithm, result["seconds"], 
+                  result["nodes_per_second"] or 0, result["expanded"], result["peak_frontier"], result["peak_rss_kb"]))
+    return {"python": platform.python_version(), "scale": scale, "repeat": repeat, "results": results}
+
+def replanning_benchmark(width=300, changes=5, rounds=20, seed=0, verbose=True):
+    """
+    Compares replanning.IncrementalPlanner against a full pathfinding.astar re-search on a width x width grid with obstacles. 
+    Every round changes the cost of changes random edges plus one edge on the current path (so the path really has to be repaired), 
+    then measures both the incremental update and the search from scratch. Returns the averages as a dictionary.
+    """
+    rng = random.Random(seed)
+    nodes, start_id, target_id, heuristic = grid_graph(width, seed=seed)
+    goal = lambda n: n.get_id() == target_id
+    edges = [(node_id, edge.target.get_id()) for (node_id, node) in nodes.items() for edge in node.get_neighbors()]
+    planner = replanning.IncrementalPlanner(nodes, start_id, target_id, heuristic)
+    began = time.perf_counter()
+    path, distance, visited, expanded = planner.plan()
+    initial = time.perf_counter() - began
+    incremental = 0.0
+    full = 0.0
+    incremental_expanded = 0
+    full_expanded = 0
+    for _ in range(rounds):
+        batch = [edges[rng.randrange(len(edges))] + (rng.choice((1.0, 2.0, 5.0)),) for _ in range(changes)]
+        if path:
+            blocked = path[rng.randrange(len(path))]
+            source_id = start_id if blocked is path[0] else path[path.index(blocked)-1].target.get_id()
+            batch.append((source_id, blocked.target.get_id(), 5.0))
+        began = time.perf_counter()
+        path, distance, visited, expanded = planner.update_edges(batch)
+        incremental += time.perf_counter() - began
+        incremental_expanded += expanded
+        began = time.perf_counter()
+        _, full_distance, _, expanded = pathfinding.astar(nodes[start_id], heuristic, goal)
+        full += time.perf_counter() - began
+        full_expanded += expanded
+        if abs(full_distance - distance) > 1e-9:
+            raise AssertionError("incremental distance %s differs from full search %s"%(distance, full_distance))
+    result = {"width": width, "changes": changes, "rounds": rounds, "initial_seconds": initial,
+              "incremental_seconds": incremental/rounds, "full_seconds": full/rounds,
+              "incremental_expanded": incremental_expanded/rounds, "full_expanded": full_expanded/rounds}
+    if verbose:
+        print("replanning %dx%d grid, %d changes: incremental %.4fs (%d expanded), full A* %.4fs (%d expanded)"%(width, width, changes, 
+              result["incremental_seconds"], result["incremental_expanded"], result["full_seconds"], result["full_expanded"]))
+    return result
+
+def _valid_path(start, path, target_id, distance):
+    """
+    Checks that path leads from start to the node with id target_id, each edge leaving the node the previous one leads to, and that 
+    its costs add up to distance.
+    """
+    position = start
+    for edge in path:
+        if all((e.target.get_id(), e.cost, e.name) != (edge.target.get_id(), edge.cost, edge.name) for e in position.get_neighbors()):
+            return False
+        position = edge.target
+    return position.get_id() == target_id and abs(sum(e.cost for e in path) - distance) < 1e-9
+
+def memory_bounded_check(targets=(5, 50, 300, 2050), sizes=(5, 6, 7, 8, 9, 12, 20, 50, 200), verbose=True):
+    """
+    Runs pathfinding.smastar on the infinite graph from 1 to each target with small max_nodes and compares it against astar. Every 
+    result has to be a valid path no shorter than the optimum, or no path at all; once max_nodes can hold an optimal path together 
+    with all successors of its nodes (4 per node) it has to be optimal. pathfinding.idastar, with table_size taken from sizes as well, 
+    has to find the optimum for the smaller targets. Both have to fail right away when the heuristic of the start is infinite. 
+    Returns a list of failure messages, i.e. an empty list if all checks pass.
+    """
+    failures = []
+    for target in targets:
+        goal = lambda n: n.get_id() == target
+        _, optimum, _, _ = pathfinding.astar(graph.InfNode(1), pathfinding.default_heuristic, goal)
+        for size in sizes:
+            began = time.perf_counter()
+            path, distance, visited, expanded = pathfinding.smastar(graph.InfNode(1), pathfinding.default_heuristic, goal, max_nodes=size)
+            elapsed = time.perf_counter() - began
+            if verbose:
+                print("smastar target %d max_nodes %d: distance %s (optimum %s), expanded %d, %.3fs"%(target, size, distance if path else None, optimum, expanded, elapsed))
+            if path and (not _valid_path(graph.InfNode(1), path, target, distance) or distance < optimum):
+                failures.append("smastar target %d max_nodes %d: invalid path"%(target, size))
+            elif size >= 4*optimum + 1 and distance != optimum:
+                failures.append("smastar target %d max_nodes %d: distance %s, optimum %s"%(target, size, distance if path else None, optimum))
+            if target <= 50:
+                path, distance, _, _ = pathfinding.idastar(graph.InfNode(1), pathfinding.default_heuristic, goal, table_size=size)
+                if distance != optimum or not _valid_path(graph.InfNode(1), path, target, distance):
+                    failures.append("idastar target %d table_size %d: distance %s, optimum %s"%(target, size, distance, optimum))
+    unreachable = lambda n: float("inf")
+    for (name, search) in (("smastar", pathfinding.smastar), ("idastar", pathfinding.idastar)):
+        path, _, _, expanded = search(graph.InfNode(1), unreachable, lambda n: n.get_id() == 50)
+        if path or expanded > 1:
+            failures.append("%s with infinite heuristic: expanded %d nodes"%(name, expanded))
+    if verbose:
+        for message in failures:
+            print("FAILED", message)
+    return failures
+
+def compare(current, baseline, tolerance=0.25, min_seconds=0.01):
+    """
+    Compares two benchmark results (as returned by run) and returns a list of regression messages: a case is flagged if it got more 
+    than tolerance (and at least min_seconds) slower, used more than tolerance more memory, or expanded more nodes than in the baseline.
+    """
+    previous = {(r["case"], r["size"], r["algorithm"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        old = previous.get((r["case"], r["size"], r["algorithm"]))
+        if old is None:
+            continue
+        name = "%s %s %s"%(r["case"], r["size"], r["algorithm"])
+        if r["seconds"] > old["seconds"]*(1+tolerance) and r["seconds"] - old["seconds"] >= min_seconds:
+            regressions.append("%s: %.3fs, was %.3fs"%(name, r["seconds"], old["seconds"]))
+        if r["peak_rss_kb"] > old["peak_rss_kb"]*(1+tolerance):
+            regressions.append("%s: peak RSS %d kB, was %d kB"%(name, r["peak_rss_kb"], old["peak_rss_kb"]))
+        if r["expanded"] > old["expanded"]:
+            regressions.append("%s: expanded %d nodes, was %d"%(name, r["expanded"], old["expanded"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the search algorithms on synthetic graphs.")
+    parser.add_argument("--scale", type=int, default=1, help="multiplies the size of all generated graphs")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per case, the fastest one is reported")
+    parser.add_argument("--replanning", action="store_true", help="also compare incremental replanning against full re-search")
+    parser.add_argument("--memory-bounded", action="store_true", help="only check smastar and idastar against astar on small memory limits")
+    parser.add_argument("--output", default="benchmark.json", help="file the results are written to")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+    if args.memory_bounded:
+        if memory_bounded_check():
+            raise SystemExit(1)
+        return
+    results = run(args.scale, args.repeat)
+    if args.replanning:
+        results["replanning"] = replanning_benchmark(int(300*math.sqrt(args.scale)))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print("REGRESSION", message)
+        if regressions:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
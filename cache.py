@@ -0,0 +1,148 @@
+from heapq import heappush, heappop
+
+import pathfinding
+
+class ShortestPathTree:
+    """
+    Dijkstra search from one start node that can be resumed. settle() only continues the search until the requested node has 
+    been removed from the frontier, so every node settled by an earlier query is answered from the stored parent pointers.
+    This also works on infinite graphs such as graph.InfNode, where the tree is never completed.
+    """
+    def __init__(self, start):
+        start_id = start.get_id()
+        self.start_id = start_id
+        self.parents = {start_id: None}
+        self.costs = {start_id: 0}
+        self.closed = set()
+        self.frontier = [(0, 0, start)]
+        self.counter = 0
+    def __len__(self):
+        return len(self.costs)
+    def settle(self, goal_id):
+        """
+        Continues the search until the node with id goal_id is settled or the graph is exhausted. Returns a pair (visited, expanded)
+        with the number of nodes added to the frontier and expanded by this call.
+        """
+        visited = 0
+        expanded = 0
+        parents = self.parents
+        costs = self.costs
+        closed = self.closed
+        frontier = self.frontier
+        while goal_id not in closed and frontier:
+            cost, _, current = heappop(frontier)
+            current_id = current.get_id()
+            if current_id in closed or cost > costs[current_id]:
+                continue
+            closed.add(current_id)
+            expanded += 1
+            for edge in current.get_neighbors():
+                target_id = edge.target.get_id()
+                if target_id in closed:
+                    continue
+                new_cost = cost + edge.cost
+                known = costs.get(target_id)
+                if known is not None and new_cost >= known:
+                    continue
+                costs[target_id] = new_cost
+                parents[target_id] = (current_id, edge)
+                visited += 1
+                self.counter += 1
+                heappush(frontier, (new_cost, self.counter, edge.target))
+        return visited, expanded
+    def path(self, goal_id):
+        """
+        Returns (path,distance,visited,expanded) for goal_id, settling it first if necessary. visited and expanded only count the work 
+        done by this call, i.e. they are 0 if goal_id was already settled.
+        """
+        visited, expanded = self.settle(goal_id)
+        if goal_id not in self.closed:
+            return [], 0, visited, expanded
+        return pathfinding._reconstruct(self.parents, goal_id), self.costs[goal_id], visited, expanded
+
+class SearchCache:
+    """
+    Caching layer in front of the search functions in pathfinding.py, for services that answer many queries from the same start nodes.
+    
+    - shortest_path() keeps a ShortestPathTree per start node id and answers every target that is already settled in it from 
+      the parent pointers alone.
+    - search() memoizes complete results of any search function, keyed by (start id, goal id, algorithm, heuristic). Heuristics 
+      are keyed by identity, so pass the same function object to get hits.
+      
+    Both caches are least recently used: at most max_entries memoized results and trees are kept, and trees are also dropped while 
+    the number of nodes stored in all of them exceeds max_nodes. The cache cannot see changes to the graph, call invalidate() after 
+    mutating it. hits and misses count the lookups of both caches.
+    """
+    def __init__(self, max_entries=256, max_nodes=1000000):
+        self.max_entries = max_entries
+        self.max_nodes = max_nodes
+        self.trees = {}
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+    def _touch(self, entries, key):
+        value = entries.pop(key)
+        entries[key] = value
+        return value
+    def _evict(self):
+        while len(self.results) > self.max_entries:
+            del self.results[next(iter(self.results))]
+        while len(self.trees) > self.max_entries or (len(self.trees) > 1 and self.stored_nodes() > self.max_nodes):
+            del self.trees[next(iter(self.trees))]
+    def stored_nodes(self):
+        """
+        Number of nodes stored in all shortest path trees.
+        """
+        return sum(len(tree) for tree in self.trees.values())
+    def shortest_path(self, start, goal_id):
+        """
+        Shortest path from start to the node with id goal_id, answered from the cached shortest path tree of start. 
+        Returns the usual 4-tuple (path,distance,visited,expanded), see ShortestPathTree.path().
+        """
+        start_id = start.get_id()
+        if start_id in self.trees:
+            tree = self._touch(self.trees, start_id)
+            if goal_id in tree.closed:
+                self.hits += 1
+            else:
+                self.misses += 1
+        else:
+            self.misses += 1
+            tree = self.trees[start_id] = ShortestPathTree(start)
+        result = tree.path(goal_id)
+        self._evict()
+        return result
+    def search(self, algorithm, start, goal_id, heuristic=None):
+        """
+        Runs algorithm (e.g. pathfinding.astar) from start with the goal predicate n.get_id() == goal_id, or returns the stored result
+        of an earlier identical call. heuristic is passed to algorithm unless it is None (for bfs and dfs).
+        """
+        key = (start.get_id(), goal_id, algorithm, heuristic)
+        if key in self.results:
+            self.hits += 1
+            return self._touch(self.results, key)
+        self.misses += 1
+        goal = lambda n: n.get_id() == goal_id
+        if heuristic is None:
+            result = algorithm(start, goal)
+        else:
+            result = algorithm(start, heuristic, goal)
+        self.results[key] = result
+        self._evict()
+        return result
+    def invalidate(self, start_id=None):
+        """
+        Drops all cached trees and results, or only those for the given start node id. Has to be called after the graph changed.
+        """
+        if start_id is None:
+            self.trees.clear()
+            self.results.clear()
+            return
+        self.trees.pop(start_id, None)
+        for key in [key for key in self.results if key[0] == start_id]:
+            del self.results[key]
+    def stats(self):
+        """
+        Returns the counters of the cache as a dictionary.
+        """
+        return {"hits": self.hits, "misses": self.misses, "trees": len(self.trees), "results": len(self.results), "stored_nodes": self.stored_nodes()}
@@ -0,0 +1,251 @@
+import random
+from heapq import heappush, heappop
+
+import graph
+import pathfinding
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy of a static, finite graph (e.g. the result of graph.make_geom_graph) for fast point-to-point queries.
+    
+    Preprocessing contracts the nodes one by one, cheapest first according to their edge difference (shortcuts added minus edges 
+    removed, plus the number of already contracted neighbors). When a node v is contracted, a shortcut u->w is added for each pair 
+    of remaining neighbors u->v->w, unless a bounded witness search finds a path from u to w that avoids v and is not longer. 
+    
+    Queries run a bidirectional Dijkstra that only follows edges towards nodes contracted later, and unpack the shortcuts on the 
+    resulting path back into the original graph.Edge objects.
+    """
+    def __init__(self, nodes, witness_limit=64):
+        if isinstance(nodes, graph.CompactGraph):
+            cgraph = nodes
+            original = lambda u, e: cgraph.edge(u, e)
+        else:
+            cgraph = graph.CompactGraph.from_graph(nodes)
+            node_list = list(nodes.values()) if isinstance(nodes, dict) else list(nodes)
+            by_id = {n.get_id(): n for n in node_list}
+            original = lambda u, e: self._original_edge(by_id, cgraph, u, e)
+        self.ids = cgraph.ids
+        self.index = cgraph.index
+        self.witness_limit = witness_limit
+        # edges maps (u, w) to (cost, via), via is None for original edges (then the third entry is the Edge object) or the contracted node
+        self.edges = {}
+        out = [dict() for _ in cgraph.ids]
+        inc = [dict() for _ in cgraph.ids]
+        for u in range(len(cgraph)):
+            for e in range(cgraph.offsets[u], cgraph.offsets[u+1]):
+                w = cgraph.targets[e]
+                cost = cgraph.costs[e]
+                if w == u or ((u, w) in self.edges and self.edges[(u, w)][0] <= cost):
+                    continue
+                self.edges[(u, w)] = (cost, None, original(u, e))
+                out[u][w] = cost
+                inc[w][u] = cost
+        self.rank = [0]*len(cgraph)
+        self.up = [[] for _ in cgraph.ids]
+        self.down = [[] for _ in cgraph.ids]
+        self.shortcuts = 0
+        self._contract(out, inc)
+    
+    @staticmethod
+    def _original_edge(by_id, cgraph, u, e):
+        """
+        Finds the Edge object of the original Node graph that corresponds to edge e of the compiled graph.
+        """
+        target_id = cgraph.ids[cgraph.targets[e]]
+        for edge in by_id[cgraph.ids[u]].get_neighbors():
+            if edge.target.get_id() == target_id and edge.cost == cgraph.costs[e]:
+                return edge
+    
+    def _witness(self, out, source, skip, limit, targets):
+        """
+        Dijkstra from source in the remaining graph, ignoring node skip, that stops at distance limit, once all targets are settled 
+        or after witness_limit settled nodes.
+        """
+        dist = {source: 0.0}
+        frontier = [(0.0, source)]
+        settled = 0
+        remaining = len(targets)
+        while frontier and settled < self.witness_limit:
+            d, u = heappop(frontier)
+            if d > dist[u]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if u in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            for w, cost in out[u].items():
+                if w == skip:
+                    continue
+                nd = d + cost
+                if nd < dist.get(w, float("inf")):
+                    dist[w] = nd
+                    heappush(frontier, (nd, w))
+        return dist
+    
+    def _shortcuts(self, out, inc, v):
+        """
+        Returns the shortcuts (u, w, cost) needed to contract node v.
+        """
+        result = []
+        for u, cost_in in inc[v].items():
+            limit = max([cost_in + c for (w, c) in out[v].items() if w != u], default=None)
+            if limit is None:
+                continue
+            dist = self._witness(out, u, v, limit, out[v].keys() - {u})
+            for w, cost_out in out[v].items():
+                if w != u and dist.get(w, float("inf")) > cost_in + cost_out:
+                    result.append((u, w, cost_in + cost_out))
+        return result
+    
+    def _priority(self, out, inc, deleted, v):
+        """
+        Returns the contraction priority of v (lower is contracted earlier) together with the shortcuts contracting it would add.
+        """
+        shortcuts = self._shortcuts(out, inc, v)
+        return len(shortcuts) - len(out[v]) - len(inc[v]) + deleted[v], shortcuts
+    
+    def _contract(self, out, inc):
+        deleted = [0]*len(out)
+        queue = [(self._priority(out, inc, deleted, v)[0], v) for v in range(len(out))]
+        queue.sort()
+        contracted = 0
+        while queue:
+            _, v = heappop(queue)
+            priority, shortcuts = self._priority(out, inc, deleted, v)
+            if queue and priority > queue[0][0]:
+                heappush(queue, (priority, v))
+                continue
+            self.rank[v] = contracted
+            contracted += 1
+            for u, w, cost in shortcuts:
+                if cost < out[u].get(w, float("inf")):
+                    out[u][w] = cost
+                    inc[w][u] = cost
+                    self.edges[(u, w)] = (cost, v, None)
+                    self.shortcuts += 1
+            for w, cost in out[v].items():
+                self.up[v].append((w, cost))
+                del inc[w][v]
+                deleted[w] += 1
+            for u, cost in inc[v].items():
+                self.down[v].append((u, cost))
+                del out[u][v]
+                deleted[u] += 1
+            out[v] = {}
+            inc[v] = {}
+    
+    def _unpack(self, u, w, path):
+        cost, via, edge = self.edges[(u, w)]
+        if via is None:
+            path.append(edge)
+        else:
+            self._unpack(u, via, path)
+            self._unpack(via, w, path)
+    
+    def query(self, start, target):
+        """
+        Shortest path from start to target, both given as node ids or Node objects. Returns the same 4-tuple as pathfinding.astar:
+        (path,distance,visited,expanded), where path is the list of original graph.Edge objects and visited/expanded count the
+        nodes added to/settled in either direction of the search.
+        """
+        if isinstance(start, graph.Node):
+            start = start.get_id()
+        if isinstance(target, graph.Node):
+            target = target.get_id()
+        s = self.index[start]
+        t = self.index[target]
+        dist = ({s: 0.0}, {t: 0.0})
+        parent = ({s: None}, {t: None})
+        frontiers = ([(0.0, s)], [(0.0, t)])
+        adjacency = (self.up, self.down)
+        settled = (set(), set())
+        best = float("inf")
+        meet = s if s == t else None
+        if s == t:
+            best = 0.0
+        visited = 2
+        expanded = 0
+        while frontiers[0] or frontiers[1]:
+            for side in (0, 1):
+                frontier = frontiers[side]
+                if not frontier:
+                    continue
+                if frontier[0][0] >= best:
+                    del frontier[:]
+                    continue
+                d, u = heappop(frontier)
+                if u in settled[side] or d > dist[side][u]:
+                    continue
+                settled[side].add(u)
+                expanded += 1
+                other = dist[1-side].get(u)
+                if other is not None and d + other < best:
+                    best = d + other
+                    meet = u
+                for w, cost in adjacency[side][u]:
+                    nd = d + cost
+                    if nd < dist[side].get(w, float("inf")):
+                        if w not in dist[side]:
+                            visited += 1
+                        dist[side][w] = nd
+                        parent[side][w] = u
+                        heappush(frontier, (nd, w))
+        if meet is None:
+            return [], 0, visited, expanded
+        forward = []
+        u = meet
+        while parent[0][u] is not None:
+            forward.append((parent[0][u], u))
+            u = parent[0][u]
+        forward.reverse()
+        u = meet
+        while parent[1][u] is not None:
+            forward.append((u, parent[1][u]))
+            u = parent[1][u]
+        path = []
+        for (a, b) in forward:
+            self._unpack(a, b, path)
+        return path, best, visited, expanded
+
+def verify(ch, nodes, pairs=100, seed=0):
+    """
+    Correctness check: compares the distances of ch.query against Dijkstra (pathfinding.astar with the default heuristic) on 
+    random pairs of node ids of nodes, which must be the graph ch was built from. Also checks that the unpacked path is a 
+    connected sequence of edges from source to target, each of them one of the neighbors of the node the previous one leads to 
+    (compared by target id, cost and name), and that their costs add up to the distance. 
+    Returns a list of (source, target, ch distance, dijkstra distance) tuples for every mismatch, i.e. an empty list if all agree.
+    """
+    if isinstance(nodes, graph.CompactGraph):
+        start_node = nodes.node
+    else:
+        start_node = lambda node_id: nodes[node_id]
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(pairs):
+        source = rng.choice(ch.ids)
+        target = rng.choice(ch.ids)
+        path, distance, _, _ = ch.query(source, target)
+        expected_path, expected, _, _ = pathfinding.astar(start_node(source), pathfinding.default_heuristic, lambda n: n.get_id() == target)
+        if not expected_path:
+            if path:
+                mismatches.append((source, target, distance, expected))
+            continue
+        position = source
+        connected = True
+        for edge in path:
+            step = (edge.target.get_id(), edge.cost, edge.name)
+            if all((e.target.get_id(), e.cost, e.name) != step for e in start_node(position).get_neighbors()):
+                connected = False
+                break
+            position = edge.target.get_id()
+        if abs(distance - expected) > 1e-9 or not connected or position != target or abs(sum(e.cost for e in path) - distance) > 1e-9:
+            mismatches.append((source, target, distance, expected))
+    return mismatches
+
+if __name__ == "__main__":
+    for name, nodes in (("Austria", graph.Austria), ("China", graph.China)):
+        ch = ContractionHierarchy(nodes)
+        print(name, "shortcuts:", ch.shortcuts, "mismatches:", verify(ch, nodes))
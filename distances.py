@@ -0,0 +1,140 @@
+import graph
+import numpy as np
+
+def compile_graph(nodes):
+    """
+    Returns nodes as a graph.CompactGraph. nodes can already be a CompactGraph, or anything graph.CompactGraph.from_graph accepts,
+    e.g. the dictionary returned by graph.make_geom_graph.
+    """
+    if isinstance(nodes, graph.CompactGraph):
+        return nodes
+    return graph.CompactGraph.from_graph(nodes)
+
+def csr_arrays(cgraph):
+    """
+    Returns NumPy views (offsets, sources, targets, costs) of the CSR arrays of a graph.CompactGraph, where sources[e] is the node 
+    edge e leaves from. Only sources is a new array, the others share memory with the graph.
+    """
+    offsets = np.frombuffer(cgraph.offsets, dtype=np.int64)
+    targets = np.frombuffer(cgraph.targets, dtype=np.int32)
+    costs = np.frombuffer(cgraph.costs, dtype=np.float64)
+    sources = np.repeat(np.arange(len(cgraph), dtype=np.int32), np.diff(offsets))
+    return offsets, sources, targets, costs
+
+def _relax(arrays, dist, rows, mask, allowed):
+    """
+    Relaxes the allowed edges leaving the nodes in rows, for the sources where mask (one row per node in rows) is True. Candidate
+    distances are reduced to one minimum per target node with np.minimum.reduceat and written to dist. Returns the nodes whose 
+    distance improved for at least one source, together with the mask of the improved sources.
+    """
+    offsets, sources, targets, costs = arrays
+    first = offsets[rows]
+    counts = offsets[rows+1] - first
+    local = np.repeat(np.arange(len(rows)), counts)
+    edges = np.arange(len(local)) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first, counts)
+    keep = allowed[edges]
+    edges = edges[keep]
+    local = local[keep]
+    if len(edges) == 0:
+        return rows[:0], mask[:0]
+    candidates = np.where(mask[local], dist[rows[local]] + costs[edges][:, None], np.inf)
+    et = targets[edges]
+    order = np.argsort(et, kind="stable")
+    et = et[order]
+    starts = np.flatnonzero(np.r_[True, et[1:] != et[:-1]])
+    touched = et[starts]
+    best = np.minimum.reduceat(candidates[order], starts, axis=0)
+    current = dist[touched]
+    improved = best < current
+    dist[touched] = np.where(improved, best, current)
+    changed = improved.any(axis=1)
+    return touched[changed], improved[changed]
+
+def relax_batch(arrays, n, batch, delta=None):
+    """
+    Exact distances from every node index in batch to all n nodes, as an (n, len(batch)) array. 
+
+    All sources are relaxed together with delta-stepping: (node, source) pairs are settled in buckets of width delta (default: four 
+    times the mean edge cost, which was within 20% of the best width on the grid, geometric and scale-free graphs of benchmark.py), 
+    all sources sharing the same bucket. Within a bucket, edges of cost at most delta are relaxed repeatedly from the 
+    pairs that improved until no pair in the bucket changes, then the heavier edges are relaxed once from all pairs of the bucket. 
+    Pairs below the bucket are final, so every pair is relaxed about once instead of whenever any of its distances improves, and 
+    each round is a handful of vectorized operations over the edges of the pairs involved.
+    """
+    offsets, sources, targets, costs = arrays
+    dist = np.full((n, len(batch)), np.inf)
+    dist[batch, np.arange(len(batch))] = 0.0
+    if delta is None:
+        delta = 4*costs.mean() if len(costs) else 1.0
+    if not delta > 0:
+        delta = 1.0
+    light = costs <= delta
+    heavy = ~light
+    settled = np.zeros(dist.shape, dtype=bool)
+    while True:
+        unsettled = np.where(settled, np.inf, dist)
+        low = unsettled.min() if unsettled.size else np.inf
+        if low == np.inf:
+            break
+        bound = (np.floor(low/delta) + 1)*delta
+        bucket = unsettled < bound
+        rows = np.flatnonzero(bucket.any(axis=1))
+        mask = bucket[rows]
+        while len(rows):
+            rows, mask = _relax(arrays, dist, rows, mask, light)
+            mask &= dist[rows] < bound
+            inside = mask.any(axis=1)
+            rows = rows[inside]
+            mask = mask[inside]
+            bucket[rows] |= mask
+        rows = np.flatnonzero(bucket.any(axis=1))
+        _relax(arrays, dist, rows, bucket[rows], heavy)
+        settled |= bucket
+    return dist
+
+def distance_matrix(nodes, sources=None, targets=None, batch_size=1):
+    """
+    Computes exact shortest path distances from every node id in sources to every node id in targets (both default to all nodes).
+    nodes is a graph.CompactGraph or a graph of Node objects, e.g. the result of graph.make_geom_graph.
+    
+    The sources are processed batch_size at a time with vectorized delta-stepping (see relax_batch). Sources in a batch share 
+    their buckets, but every round then carries all of their columns, so on the benchmark graphs single sources were fastest or
+    tied (20000 node geometric graph, 32 sources: 1.9s with batch_size 1, 2.9s with 4, 3.4s with 16).
+    
+    Returns a pair (matrix, table):
+        - matrix is a NumPy float64 array with matrix[i][j] the distance from sources[i] to targets[j] (inf if unreachable)
+        - table is a dictionary of dictionaries with table[source][target] the same distance, in the shape of graph.AustriaHeuristic
+    """
+    cgraph = compile_graph(nodes)
+    if sources is None:
+        sources = cgraph.ids
+    if targets is None:
+        targets = cgraph.ids
+    sources = list(sources)
+    targets = list(targets)
+    source_index = np.array([cgraph.index[s] for s in sources], dtype=np.int64)
+    target_index = np.array([cgraph.index[t] for t in targets], dtype=np.int64)
+    arrays = csr_arrays(cgraph)
+    matrix = np.empty((len(sources), len(targets)))
+    for a in range(0, len(sources), batch_size):
+        batch = source_index[a:a+batch_size]
+        dist = relax_batch(arrays, len(cgraph), batch)
+        matrix[a:a+len(batch)] = dist[target_index].T
+    return matrix, table_view(matrix, sources, targets)
+
+def table_view(matrix, sources, targets):
+    """
+    Converts a distance matrix with rows for sources and columns for targets into a dictionary of dictionaries table[source][target].
+    """
+    return {s: dict(zip(targets, row)) for (s, row) in zip(sources, matrix.tolist())}
+
+def heuristic_table(nodes, goals=None, batch_size=1):
+    """
+    Builds a table like graph.AustriaHeuristic: table[goal][n] is the exact distance from node n to goal, for all nodes n and 
+    every goal in goals (default all nodes). Distances are computed on the reversed graph, so the table is also exact for 
+    directed graphs. Returns the same (matrix, table) pair as distance_matrix, matrix having one row per goal.
+    
+    Can be used as a drop-in replacement for the hand-written tables, e.g. lambda n: table[target][n.get_id()].
+    """
+    cgraph = compile_graph(nodes)
+    return distance_matrix(cgraph.reverse(), goals, None, batch_size)
@@ -1,4 +1,7 @@
+from array import array
+
 class Node:
+    __slots__ = ()
     def get_id(self):
         """
         Returns a unique identifier for the node (for example, the name, the hash value of the contents, etc.), used to compare two nodes for equality.
@@ -10,46 +13,139 @@ class Node:
         where target is a Node object, cost is a numeric value representing the distance between the two nodes, and name is a string representing the path taken to the neighbor.
         """
         return []
+    def get_predecessors(self):
+        """
+        Returns all nodes from which this node can be reached, as a list of Edge objects that point backwards: target is the predecessor, 
+        while cost and name are those of the edge leading from the predecessor to this node. Used by the bidirectional searches.
+        """
+        return []
     def __eq__(self, other):
         return self.get_id() == other.get_id()
+    def __hash__(self):
+        return hash(self.get_id())
         
 class Edge:
     """
     Abstraction of a graph edge. Has a target (Node that the edge leads to), a cost (numeric) and a name (string), which can be used to print the edge.
     """
+    __slots__ = ("target", "cost", "name")
     def __init__(self, target, cost, name):
         self.target = target 
         self.cost = cost
         self.name = name
 
+class InfEdge(Edge):
+    """
+    Edge of the infinite graph (see InfNode). Instead of a name string it stores the two numbers and the operation, and only formats 
+    the name (e.g. "4 - *2 - 8") when it is read, i.e. when a path is printed. The cost is always 1.
+    """
+    __slots__ = ("source", "op", "dest")
+    def __init__(self, target, source, op, dest):
+        self.target = target
+        self.cost = 1
+        self.source = source
+        self.op = op
+        self.dest = dest
+    @property
+    def name(self):
+        return "%d - %s - %d"%(self.source, self.op, self.dest)
+
 class GeomNode(Node):
     """
     Representation of a finite graph in which all nodes are kept in memory at all times, and stored in the node's neighbors field.
     """
+    __slots__ = ("name", "neighbors")
     def __init__(self, name):
         self.name = name
         self.neighbors = []
     def get_neighbors(self):
         return self.neighbors
+    def get_predecessors(self):
+        """
+        Graphs created by make_geom_graph are symmetric, so the predecessors are the neighbors, with the edge names reversed.
+        """
+        return [Edge(e.target, e.cost, "%s - %s"%(e.target.get_id(), self.name)) for e in self.neighbors]
     def get_id(self):
         return self.name
         
 class InfNode(Node):
     """
-    Infinite graph, in which every node represents an integer, and neighbors are generated on demand. Note that Nodes are not cached, i.e. if you
+    Infinite graph, in which every node represents an integer, and neighbors are generated on demand. Note that Nodes are not cached by default, i.e. if you
     request the neighbors of node 1, and the neighbors of node 3, both will contain the node 2, but they will be using two distinct objects. 
+    Nodes created by an InfNodeCache are interned instead: their neighbors come from the same cache, and with an unbounded cache each 
+    of them builds its list of edges only once. Edge names are formatted lazily, see InfEdge.
     """
-    def __init__(self, nr):
+    __slots__ = ("nr", "cache", "edges")
+    def __init__(self, nr, cache=None):
         self.nr = nr
+        self.cache = cache
+        self.edges = None
     def get_neighbors(self):
-        result = [Edge(InfNode(self.nr-1),1,("%d - -1 - %d"%(self.nr,self.nr-1))), Edge(InfNode(self.nr+1),1,("%d - +1 - %d"%(self.nr,self.nr+1))), Edge(InfNode(self.nr*2),1,("%d - *2 - %d"%(self.nr,self.nr*2)))]
-        if self.nr%2 == 0:
-            result.append(Edge(InfNode(self.nr//2),1,("%d - /2 - %d"%(self.nr,self.nr//2))))
+        if self.edges is not None:
+            return self.edges
+        nr = self.nr
+        make = InfNode if self.cache is None else self.cache
+        result = [InfEdge(make(nr-1),nr,"-1",nr-1), InfEdge(make(nr+1),nr,"+1",nr+1), InfEdge(make(nr*2),nr,"*2",nr*2)]
+        if nr%2 == 0:
+            result.append(InfEdge(make(nr//2),nr,"/2",nr//2))
+        if self.cache is not None and self.cache.maxsize is None:
+            self.edges = result
+        return result
+    @staticmethod
+    def array_successors(nr):
+        """
+        Vectorized form of get_neighbors for a whole array of numbers (e.g. a NumPy int64 array), used by vectorsearch.vector_bfs.
+        Returns a list of (operation, targets, valid) triples, one per kind of edge, where targets holds the neighbor of every
+        number and valid is a boolean mask of the numbers that have such an edge, or None if all of them do.
+        """
+        return [("-1", nr-1, None), ("+1", nr+1, None), ("*2", nr*2, None), ("/2", nr//2, nr%2 == 0)]
+    def get_predecessors(self):
+        nr = self.nr
+        make = InfNode if self.cache is None else self.cache
+        result = [InfEdge(make(nr+1),nr+1,"-1",nr), InfEdge(make(nr-1),nr-1,"+1",nr), InfEdge(make(nr*2),nr*2,"/2",nr)]
+        if nr%2 == 0:
+            result.append(InfEdge(make(nr//2),nr//2,"*2",nr))
         return result
     def get_id(self):
         return self.nr
 
 
+class InfNodeCache:
+    """
+    Interning (flyweight) factory for InfNode: calling it with a number returns the one InfNode object for that number, e.g.
+    start = InfNodeCache()(1). If maxsize is given, at most maxsize nodes are kept and the least recently used one is dropped 
+    when the cache is full. hits and misses count the lookups.
+    Interning pays off when several searches run over the same region of the graph, since every node builds its edges only once.
+    
+    With maxsize, nodes do not keep their list of edges (which would keep their neighbors, and their neighbors' neighbors, alive 
+    after they were dropped from the cache), but request their neighbors from the cache on every get_neighbors call. A request for 
+    a number whose node was dropped creates a new object, so two InfNode objects for the same number can be alive at the same time, 
+    e.g. when a search still holds the old one. They are equal and hash alike, since both have the same get_id().
+    """
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.nodes = {}
+        self.hits = 0
+        self.misses = 0
+    def __call__(self, nr):
+        nodes = self.nodes
+        node = nodes.get(nr)
+        if node is not None:
+            self.hits += 1
+            if self.maxsize is not None:
+                del nodes[nr]
+                nodes[nr] = node
+            return node
+        self.misses += 1
+        if self.maxsize is not None and len(nodes) >= self.maxsize:
+            del nodes[next(iter(nodes))]
+        node = nodes[nr] = InfNode(nr, self)
+        return node
+    def __len__(self):
+        return len(self.nodes)
+    def clear(self):
+        self.nodes.clear()
+
 def make_geom_graph(nodes, edges):
     """
     Given a list of nodes and edges (with distances), creates a dictionary of Node objects 
@@ -64,70 +160,248 @@ def make_geom_graph(nodes, edges):
         result[b].neighbors.append(Edge(result[a], d, "%s - %s"%(b,a)))
     return result
     
-Austria = make_geom_graph(
-    ["Graz", "Vienna", "Salzburg", "Innsbruck", "Munich", "Bregenz", "Linz", "Eisenstadt", "Klagenfurt", "Lienz", "Bruck"],
-    [("Graz", "Bruck", 55.0),
-     ("Graz", "Klagenfurt", 136.0),
-     ("Graz", "Vienna", 200.0),
-     ("Graz", "Eisenstadt", 173.0),
-     ("Bruck", "Klagenfurt", 152.0),
-     ("Bruck", "Salzburg", 215.0),
-     ("Bruck", "Linz", 195.0),
-     ("Bruck", "Vienna", 150.0),
-     ("Vienna", "Eisenstadt", 60.0),
-     ("Vienna", "Linz", 184.0),
-     ("Linz", "Salzburg", 123.0),
-     ("Salzburg", "Munich", 145.0),
-     ("Salzburg", "Klagenfurt", 223.0),
-     ("Klagenfurt", "Lienz", 145.0),
-     ("Lienz", "Innsbruck", 180.0),
-     ("Munich", "Innsbruck", 151.0),
-     ("Munich", "Bregenz", 180.0),
-     ("Innsbruck", "Bregenz", 190.0)])
-     
-AustriaHeuristic = { 
-   "Graz":       {"Graz": 0.0,   "Vienna": 180.0, "Eisenstadt": 150.0, "Bruck": 50.0,  "Linz": 225.0, "Salzburg": 250.0, "Klagenfurt": 125.0, "Lienz": 270.0, "Innsbruck": 435.0, "Munich": 375.0, "Bregenz": 450.0},
-   "Vienna":     {"Graz": 180.0, "Vienna": 0.0,   "Eisenstadt": 50.0,  "Bruck": 126.0, "Linz": 175.0, "Salzburg": 285.0, "Klagenfurt": 295.0, "Lienz": 400.0, "Innsbruck": 525.0, "Munich": 407.0, "Bregenz": 593.0},
-   "Eisenstadt": {"Graz": 150.0, "Vienna": 50.0,  "Eisenstadt": 0.0,   "Bruck": 171.0, "Linz": 221.0, "Salzburg": 328.0, "Klagenfurt": 335.0, "Lienz": 437.0, "Innsbruck": 569.0, "Munich": 446.0, "Bregenz": 630.0},
-   "Bruck":      {"Graz": 50.0,  "Vienna": 126.0, "Eisenstadt": 171.0, "Bruck": 0.0,   "Linz": 175.0, "Salzburg": 201.0, "Klagenfurt": 146.0, "Lienz": 287.0, "Innsbruck": 479.0, "Munich": 339.0, "Bregenz": 521.0},
-   "Linz":       {"Graz": 225.0, "Vienna": 175.0, "Eisenstadt": 221.0, "Bruck": 175.0, "Linz": 0.0,   "Salzburg": 117.0, "Klagenfurt": 311.0, "Lienz": 443.0, "Innsbruck": 378.0, "Munich": 265.0, "Bregenz": 456.0},
-   "Salzburg":   {"Graz": 250.0, "Vienna": 285.0, "Eisenstadt": 328.0, "Bruck": 201.0, "Linz": 117.0, "Salzburg": 0.0,   "Klagenfurt": 201.0, "Lienz": 321.0, "Innsbruck": 265.0, "Munich": 132.0, "Bregenz": 301.0},
-   "Klagenfurt": {"Graz": 125.0, "Vienna": 295.0, "Eisenstadt": 335.0, "Bruck": 146.0, "Linz": 311.0, "Salzburg": 201.0, "Klagenfurt": 0.0,   "Lienz": 132.0, "Innsbruck": 301.0, "Munich": 443.0, "Bregenz": 465.0},
-   "Lienz":      {"Graz": 270.0, "Vienna": 400.0, "Eisenstadt": 437.0, "Bruck": 287.0, "Linz": 443.0, "Salzburg": 321.0, "Klagenfurt": 132.0, "Lienz": 0.0,   "Innsbruck": 157.0, "Munich": 298.0, "Bregenz": 332.0},
-   "Innsbruck":  {"Graz": 435.0, "Vienna": 525.0, "Eisenstadt": 569.0, "Bruck": 479.0, "Linz": 378.0, "Salzburg": 265.0, "Klagenfurt": 301.0, "Lienz": 157.0, "Innsbruck": 0.0,   "Munich": 143.0, "Bregenz": 187.0},
-   "Munich":     {"Graz": 375.0, "Vienna": 407.0, "Eisenstadt": 446.0, "Bruck": 339.0, "Linz": 265.0, "Salzburg": 132.0, "Klagenfurt": 443.0, "Lienz": 298.0, "Innsbruck": 143.0, "Munich": 0.0,   "Bregenz": 165.0},
-   "Bregenz":    {"Graz": 450.0, "Vienna": 593.0, "Eisenstadt": 630.0, "Bruck": 521.0, "Linz": 456.0, "Salzburg": 301.0, "Klagenfurt": 465.0, "Lienz": 332.0, "Innsbruck": 187.0, "Munich": 165.0, "Bregenz": 0.0}}
+class CompactNode(Node):
+    """
+    View of a single node of a CompactGraph, so that a compiled graph can be passed to the search functions like any other Node.
+    Only holds the graph and the dense int index of the node, neighbors are materialized as Edge objects on request.
+    """
+    __slots__ = ("graph", "index")
+    def __init__(self, graph, index):
+        self.graph = graph
+        self.index = index
+    def get_neighbors(self):
+        graph = self.graph
+        return [graph.edge(self.index, e) for e in range(graph.offsets[self.index], graph.offsets[self.index+1])]
+    def get_predecessors(self):
+        return self.graph.predecessors(self.index)
+    def get_id(self):
+        return self.graph.ids[self.index]
+
+class CompactGraph:
+    """
+    Compressed sparse row (CSR) representation of a finite graph. Node ids are interned to dense ints: ids[i] is the original id of 
+    node i and index[id] its int. The outgoing edges of node i are the edges offsets[i] to offsets[i+1]-1, edge e leads to node targets[e] 
+    and costs costs[e]. offsets, targets and costs are array.array buffers (int64, int32 and float64), so neighbor iteration is a slice
+    and numpy.frombuffer can view them without copying.
+    
+    Edge names are not stored unless they differ from the "%s - %s" format used by make_geom_graph, in which case names holds them
+    per edge. edge_name() and edge() build them on demand, i.e. only for edges that end up on a printed path.
+    """
+    def __init__(self, ids, offsets, targets, costs, names=None):
+        self.ids = ids
+        self.index = {node_id: i for (i, node_id) in enumerate(ids)}
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.names = names
+        self.reversed = None
+    def __len__(self):
+        return len(self.ids)
+    def neighbors(self, i):
+        """
+        Returns the slices (targets, costs) of the outgoing edges of node i.
+        """
+        a = self.offsets[i]
+        b = self.offsets[i+1]
+        return self.targets[a:b], self.costs[a:b]
+    def edge_name(self, source, e):
+        """
+        Name of edge e, which leaves node source.
+        """
+        if self.names is not None:
+            return self.names[e]
+        return "%s - %s"%(self.ids[source], self.ids[self.targets[e]])
+    def edge(self, source, e):
+        """
+        Returns edge e, which leaves node source, as an Edge object leading to a CompactNode.
+        """
+        return Edge(CompactNode(self, self.targets[e]), self.costs[e], self.edge_name(source, e))
+    def predecessors(self, i):
+        """
+        Returns the edges leading into node i as backwards pointing Edge objects (see Node.get_predecessors). The reversed graph is
+        built on the first call and kept in the reversed attribute.
+        """
+        if self.reversed is None:
+            self.reversed = self.reverse()
+        rev = self.reversed
+        return [Edge(CompactNode(self, rev.targets[e]), rev.costs[e], rev.names[e] if rev.names is not None else "%s - %s"%(self.ids[rev.targets[e]], self.ids[i])) 
+                for e in range(rev.offsets[i], rev.offsets[i+1])]
+    def node(self, node_id):
+        """
+        Returns a CompactNode for the given (original) node id, to be used as a start node for the search functions.
+        """
+        return CompactNode(self, self.index[node_id])
+    def __getitem__(self, node_id):
+        return self.node(node_id)
+    def reverse(self):
+        """
+        Returns a CompactGraph with the same node indices and every edge reversed, e.g. to compute distances *to* a node.
+        """
+        n = len(self.ids)
+        offsets = array("q", bytes(8*(n+1)))
+        for t in self.targets:
+            offsets[t+1] += 1
+        for i in range(n):
+            offsets[i+1] += offsets[i]
+        fill = array("q", offsets[:-1])
+        targets = array("i", bytes(4*len(self.targets)))
+        costs = array("d", bytes(8*len(self.targets)))
+        names = None if self.names is None else [None]*len(self.targets)
+        for source in range(n):
+            for e in range(self.offsets[source], self.offsets[source+1]):
+                t = self.targets[e]
+                targets[fill[t]] = source
+                costs[fill[t]] = self.costs[e]
+                if names is not None:
+                    names[fill[t]] = self.names[e]
+                fill[t] += 1
+        return CompactGraph(self.ids, offsets, targets, costs, names)
+    
+    @classmethod
+    def from_graph(cls, nodes):
+        """
+        Compiles a graph of Node objects, e.g. the dictionary returned by make_geom_graph or a list of nodes, into a CompactGraph. 
+        Nodes that are only reachable as edge targets are included as well, so the graph has to be finite.
+        """
+        if isinstance(nodes, dict):
+            nodes = nodes.values()
+        ids = []
+        index = {}
+        pending = []
+        for n in nodes:
+            if n.get_id() not in index:
+                index[n.get_id()] = len(ids)
+                ids.append(n.get_id())
+                pending.append(n)
+        offsets = array("q", [0])
+        targets = array("i")
+        costs = array("d")
+        names = []
+        default_names = True
+        i = 0
+        while i < len(pending):
+            source_id = pending[i].get_id()
+            for edge in pending[i].get_neighbors():
+                target_id = edge.target.get_id()
+                if target_id not in index:
+                    index[target_id] = len(ids)
+                    ids.append(target_id)
+                    pending.append(edge.target)
+                targets.append(index[target_id])
+                costs.append(edge.cost)
+                names.append(edge.name)
+                if default_names and edge.name != "%s - %s"%(source_id, target_id):
+                    default_names = False
+            offsets.append(len(targets))
+            i += 1
+        return cls(ids, offsets, targets, costs, None if default_names else names)
+
+def make_compact_graph(nodes, edges):
+    """
+    Same as make_geom_graph, but builds a CompactGraph directly from the node and edge lists, without creating a Node or Edge 
+    object per city or road. Each edge is again replaced with two directed edges, in the same order as make_geom_graph adds them.
+    """
+    ids = list(nodes)
+    index = {c: i for (i, c) in enumerate(ids)}
+    offsets = array("q", bytes(8*(len(ids)+1)))
+    for (a,b,d) in edges:
+        offsets[index[a]+1] += 1
+        offsets[index[b]+1] += 1
+    for i in range(len(ids)):
+        offsets[i+1] += offsets[i]
+    fill = array("q", offsets[:-1])
+    targets = array("i", bytes(4*offsets[-1]))
+    costs = array("d", bytes(8*offsets[-1]))
+    for (a,b,d) in edges:
+        i = index[a]
+        j = index[b]
+        targets[fill[i]] = j
+        costs[fill[i]] = d
+        fill[i] += 1
+        targets[fill[j]] = i
+        costs[fill[j]] = d
+        fill[j] += 1
+    return CompactGraph(ids, offsets, targets, costs)
+    
+def _austria():
+    return make_geom_graph(
+        ["Graz", "Vienna", "Salzburg", "Innsbruck", "Munich", "Bregenz", "Linz", "Eisenstadt", "Klagenfurt", "Lienz", "Bruck"],
+        [("Graz", "Bruck", 55.0),
+         ("Graz", "Klagenfurt", 136.0),
+         ("Graz", "Vienna", 200.0),
+         ("Graz", "Eisenstadt", 173.0),
+         ("Bruck", "Klagenfurt", 152.0),
+         ("Bruck", "Salzburg", 215.0),
+         ("Bruck", "Linz", 195.0),
+         ("Bruck", "Vienna", 150.0),
+         ("Vienna", "Eisenstadt", 60.0),
+         ("Vienna", "Linz", 184.0),
+         ("Linz", "Salzburg", 123.0),
+         ("Salzburg", "Munich", 145.0),
+         ("Salzburg", "Klagenfurt", 223.0),
+         ("Klagenfurt", "Lienz", 145.0),
+         ("Lienz", "Innsbruck", 180.0),
+         ("Munich", "Innsbruck", 151.0),
+         ("Munich", "Bregenz", 180.0),
+         ("Innsbruck", "Bregenz", 190.0)])
 
-China=make_geom_graph(
-    ["Beijing","Hainan","Changsha","Wuhan","Guangzhou","Hubei","Xiamen","Guangxi","Hunan","Shanghai"],
-    [("Beijing","Changsha",50.0),
-     ("Beijing","Hainan",70.0),
-     ("Changsha","Guangzhou",105.0),
-     ("Changsha","Wuhan",100.0),
-     ("Hainan","Guangzhou",80.0),
-     ("Hainan","Xiamen",120.0),
-     ("Guangzhou","Hubei",40.0),
-     ("Guangzhou","Xiamen",140.0),
-     ("Wuhan","Shanghai",200.0),
-     ("Wuhan","Hubei",45.0),
-     ("Hubei","Xiamen",80.0),
-     ("Hubei","Hunan",175.0),
-     ("Xiamen","Guangxi",200.0),
-     ("Guangxi","Hunan",100.0),
-     ("Hunan","Shanghai",125.0)])
+def _austria_heuristic():
+    return { 
+       "Graz":       {"Graz": 0.0,   "Vienna": 180.0, "Eisenstadt": 150.0, "Bruck": 50.0,  "Linz": 225.0, "Salzburg": 250.0, "Klagenfurt": 125.0, "Lienz": 270.0, "Innsbruck": 435.0, "Munich": 375.0, "Bregenz": 450.0},
+       "Vienna":     {"Graz": 180.0, "Vienna": 0.0,   "Eisenstadt": 50.0,  "Bruck": 126.0, "Linz": 175.0, "Salzburg": 285.0, "Klagenfurt": 295.0, "Lienz": 400.0, "Innsbruck": 525.0, "Munich": 407.0, "Bregenz": 593.0},
+       "Eisenstadt": {"Graz": 150.0, "Vienna": 50.0,  "Eisenstadt": 0.0,   "Bruck": 171.0, "Linz": 221.0, "Salzburg": 328.0, "Klagenfurt": 335.0, "Lienz": 437.0, "Innsbruck": 569.0, "Munich": 446.0, "Bregenz": 630.0},
+       "Bruck":      {"Graz": 50.0,  "Vienna": 126.0, "Eisenstadt": 171.0, "Bruck": 0.0,   "Linz": 175.0, "Salzburg": 201.0, "Klagenfurt": 146.0, "Lienz": 287.0, "Innsbruck": 479.0, "Munich": 339.0, "Bregenz": 521.0},
+       "Linz":       {"Graz": 225.0, "Vienna": 175.0, "Eisenstadt": 221.0, "Bruck": 175.0, "Linz": 0.0,   "Salzburg": 117.0, "Klagenfurt": 311.0, "Lienz": 443.0, "Innsbruck": 378.0, "Munich": 265.0, "Bregenz": 456.0},
+       "Salzburg":   {"Graz": 250.0, "Vienna": 285.0, "Eisenstadt": 328.0, "Bruck": 201.0, "Linz": 117.0, "Salzburg": 0.0,   "Klagenfurt": 201.0, "Lienz": 321.0, "Innsbruck": 265.0, "Munich": 132.0, "Bregenz": 301.0},
+       "Klagenfurt": {"Graz": 125.0, "Vienna": 295.0, "Eisenstadt": 335.0, "Bruck": 146.0, "Linz": 311.0, "Salzburg": 201.0, "Klagenfurt": 0.0,   "Lienz": 132.0, "Innsbruck": 301.0, "Munich": 443.0, "Bregenz": 465.0},
+       "Lienz":      {"Graz": 270.0, "Vienna": 400.0, "Eisenstadt": 437.0, "Bruck": 287.0, "Linz": 443.0, "Salzburg": 321.0, "Klagenfurt": 132.0, "Lienz": 0.0,   "Innsbruck": 157.0, "Munich": 298.0, "Bregenz": 332.0},
+       "Innsbruck":  {"Graz": 435.0, "Vienna": 525.0, "Eisenstadt": 569.0, "Bruck": 479.0, "Linz": 378.0, "Salzburg": 265.0, "Klagenfurt": 301.0, "Lienz": 157.0, "Innsbruck": 0.0,   "Munich": 143.0, "Bregenz": 187.0},
+       "Munich":     {"Graz": 375.0, "Vienna": 407.0, "Eisenstadt": 446.0, "Bruck": 339.0, "Linz": 265.0, "Salzburg": 132.0, "Klagenfurt": 443.0, "Lienz": 298.0, "Innsbruck": 143.0, "Munich": 0.0,   "Bregenz": 165.0},
+       "Bregenz":    {"Graz": 450.0, "Vienna": 593.0, "Eisenstadt": 630.0, "Bruck": 521.0, "Linz": 456.0, "Salzburg": 301.0, "Klagenfurt": 465.0, "Lienz": 332.0, "Innsbruck": 187.0, "Munich": 165.0, "Bregenz": 0.0}}
 
-ChinaHeruistic={
-"Beijing":  {"Beijing":0.0, "Hainan": 60.0, "Changsha":40.0, "Wuhan": 130.0,"Guangzhou":70.0, "Hubei":130.0,"Xiamen": 140.0,"Guangxi":450.0,"Hunan": 420.0, "Shanghai":440.0},
-"Hainan":   {"Beijing":60.0, "Hainan": 0.0, "Changsha":100.0, "Wuhan": 160.0,"Guangzhou":50.0, "Hubei":110.0,"Xiamen": 120.0,"Guangxi":350.0,"Hunan": 320.0, "Shanghai":340.0},
-"Changsha": {"Beijing":40.0, "Hainan": 90.0, "Changsha":0.0, "Wuhan": 100.0,"Guangzhou":40.0, "Hubei":100.0,"Xiamen": 130.0,"Guangxi":400.0,"Hunan": 370.0, "Shanghai":320.0},
-"Wuhan":    {"Beijing":120.0, "Hainan": 110.0, "Changsha":100.0, "Wuhan": 0.0,"Guangzhou":40.0, "Hubei":45.0,"Xiamen": 100.0,"Guangxi":280.0,"Hunan": 250.0, "Shanghai":200.0},
-"Guangzhou":{"Beijing":70.0, "Hainan": 80.0, "Changsha":40.0, "Wuhan": 40.0,"Guangzhou":0.0, "Hubei":40.0,"Xiamen": 90.0,"Guangxi":220.0,"Hunan": 250.0, "Shanghai":280.0},
-"Hubei":    {"Beijing":120.0, "Hainan": 110.0, "Changsha":100.0, "Wuhan": 45.0,"Guangzhou":40.0, "Hubei":0.0,"Xiamen": 80.0,"Guangxi":125.0,"Hunan": 100.0, "Shanghai":150.0},
-"Xiamen":   {"Beijing":140.0, "Hainan": 120.0, "Changsha":130.0, "Wuhan": 100.0,"Guangzhou":90.0, "Hubei":80.0,"Xiamen": 0.0,"Guangxi":150.0,"Hunan": 200.0, "Shanghai":250.0},
-"Guangxi":  {"Beijing":450.0, "Hainan": 35.0, "Changsha":400.0, "Wuhan": 280.0,"Guangzhou":220.0, "Hubei":125.0,"Xiamen": 120.0,"Guangxi":0.0,"Hunan": 100.0, "Shanghai":200.0},
-"Hunan":    {"Beijing":420.0, "Hainan": 320.0, "Changsha":370.0, "Wuhan": 250.0,"Guangzhou":250.0, "Hubei":125.0,"Xiamen": 200.0,"Guangxi":100.0,"Hunan": 0.0, "Shanghai":100.0},
-"Shanghai": {"Beijing":440.0, "Hainan": 340.0, "Changsha":320.0, "Wuhan": 200.0,"Guangzhou":280.0, "Hubei":150.0,"Xiamen": 250.0,"Guangxi":200.0,"Hunan": 100.0, "Shanghai":0.0}
+def _china():
+    return make_geom_graph(
+        ["Beijing","Hainan","Changsha","Wuhan","Guangzhou","Hubei","Xiamen","Guangxi","Hunan","Shanghai"],
+        [("Beijing","Changsha",50.0),
+         ("Beijing","Hainan",70.0),
+         ("Changsha","Guangzhou",105.0),
+         ("Changsha","Wuhan",100.0),
+         ("Hainan","Guangzhou",80.0),
+         ("Hainan","Xiamen",120.0),
+         ("Guangzhou","Hubei",40.0),
+         ("Guangzhou","Xiamen",140.0),
+         ("Wuhan","Shanghai",200.0),
+         ("Wuhan","Hubei",45.0),
+         ("Hubei","Xiamen",80.0),
+         ("Hubei","Hunan",175.0),
+         ("Xiamen","Guangxi",200.0),
+         ("Guangxi","Hunan",100.0),
+         ("Hunan","Shanghai",125.0)])
 
-}
+def _china_heuristic():
+    return {
+    "Beijing":  {"Beijing":0.0, "Hainan": 60.0, "Changsha":40.0, "Wuhan": 130.0,"Guangzhou":70.0, "Hubei":130.0,"Xiamen": 140.0,"Guangxi":450.0,"Hunan": 420.0, "Shanghai":440.0},
+    "Hainan":   {"Beijing":60.0, "Hainan": 0.0, "Changsha":100.0, "Wuhan": 160.0,"Guangzhou":50.0, "Hubei":110.0,"Xiamen": 120.0,"Guangxi":350.0,"Hunan": 320.0, "Shanghai":340.0},
+    "Changsha": {"Beijing":40.0, "Hainan": 90.0, "Changsha":0.0, "Wuhan": 100.0,"Guangzhou":40.0, "Hubei":100.0,"Xiamen": 130.0,"Guangxi":400.0,"Hunan": 370.0, "Shanghai":320.0},
+    "Wuhan":    {"Beijing":120.0, "Hainan": 110.0, "Changsha":100.0, "Wuhan": 0.0,"Guangzhou":40.0, "Hubei":45.0,"Xiamen": 100.0,"Guangxi":280.0,"Hunan": 250.0, "Shanghai":200.0},
+    "Guangzhou":{"Beijing":70.0, "Hainan": 80.0, "Changsha":40.0, "Wuhan": 40.0,"Guangzhou":0.0, "Hubei":40.0,"Xiamen": 90.0,"Guangxi":220.0,"Hunan": 250.0, "Shanghai":280.0},
+    "Hubei":    {"Beijing":120.0, "Hainan": 110.0, "Changsha":100.0, "Wuhan": 45.0,"Guangzhou":40.0, "Hubei":0.0,"Xiamen": 80.0,"Guangxi":125.0,"Hunan": 100.0, "Shanghai":150.0},
+    "Xiamen":   {"Beijing":140.0, "Hainan": 120.0, "Changsha":130.0, "Wuhan": 100.0,"Guangzhou":90.0, "Hubei":80.0,"Xiamen": 0.0,"Guangxi":150.0,"Hunan": 200.0, "Shanghai":250.0},
+    "Guangxi":  {"Beijing":450.0, "Hainan": 35.0, "Changsha":400.0, "Wuhan": 280.0,"Guangzhou":220.0, "Hubei":125.0,"Xiamen": 120.0,"Guangxi":0.0,"Hunan": 100.0, "Shanghai":200.0},
+    "Hunan":    {"Beijing":420.0, "Hainan": 320.0, "Changsha":370.0, "Wuhan": 250.0,"Guangzhou":250.0, "Hubei":125.0,"Xiamen": 200.0,"Guangxi":100.0,"Hunan": 0.0, "Shanghai":100.0},
+    "Shanghai": {"Beijing":440.0, "Hainan": 340.0, "Changsha":320.0, "Wuhan": 200.0,"Guangzhou":280.0, "Hubei":150.0,"Xiamen": 250.0,"Guangxi":200.0,"Hunan": 100.0, "Shanghai":0.0}
 
+    }
 
+_example_graphs = {"Austria": _austria, "AustriaHeuristic": _austria_heuristic, "China": _china, "ChinaHeruistic": _china_heuristic}
+
+def __getattr__(name):
+    """
+    Builds the example graphs Austria and China and their heuristic tables on first access (e.g. graph.Austria), so that importing 
+    this module is cheap. Each one is built once and then stored as a regular module attribute.
+    """
+    if name in _example_graphs:
+        value = _example_graphs[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r"%(__name__, name))
@@ -0,0 +1,194 @@
+import mmap
+import struct
+import sys
+from array import array
+
+import graph
+import landmarks
+
+_MAGIC = b"PGF1"
+_HEADER = struct.Struct("<qqqqq")
+_EDGE_NAMES = 1
+_INT_IDS = 2
+
+# Layout of a graph file, all numbers little endian and every section starting at a multiple of 8 bytes:
+#
+#     magic         4 bytes b"PGF1", padded to 8
+#     header        n, m, flags, number of heuristic targets h, number of landmarks k (5 x int64)
+#     offsets       (n+1) x int64, CSR offsets as in graph.CompactGraph
+#     targets       m x int32
+#     costs         m x float64
+#     node names    string table with n entries, or n x int64 if flags has _INT_IDS set
+#     edge names    string table with m entries, only if flags has _EDGE_NAMES set
+#     heuristic     h x int64 target node indices, then h*n x float64 (row per target, columns in node order)
+#     landmarks     k x int64 landmark node indices, then k*n x float64 forward and k*n x float64 backward distances
+#
+# A string table is (entries+1) x int64 byte offsets followed by the UTF-8 encoded strings.
+
+class StringTable:
+    """
+    Read-only sequence of strings stored as byte offsets into a UTF-8 buffer. Strings are only decoded when accessed, so the
+    edge names of a graph file cost nothing until a path is printed.
+    """
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+    def __len__(self):
+        return len(self.offsets) - 1
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i+1]], "utf-8")
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def _write_strings(f, strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("q", [0])
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+    _write_array(f, offsets)
+    f.write(b"".join(encoded))
+    _pad(f)
+
+def _write_array(f, values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+    _pad(f)
+
+def _pad(f):
+    f.write(bytes(-f.tell() % 8))
+
+def write_graph(filename, nodes, heuristic=None, alt=None):
+    """
+    Writes a graph to a binary graph file that read_graph can map into memory. nodes is the result of graph.make_geom_graph,
+    any other graph of Node objects whose ids are all strings or all ints (see graph.CompactGraph.from_graph), or a graph.CompactGraph.
+
+    heuristic is an optional table in the shape of graph.AustriaHeuristic, i.e. heuristic[target][n] estimates the distance from
+    node n to target; estimates that are missing from the table are stored as 0. alt optionally adds the arrays of a
+    landmarks.Landmarks object built for the same graph.
+    """
+    cgraph = nodes if isinstance(nodes, graph.CompactGraph) else graph.CompactGraph.from_graph(nodes)
+    n = len(cgraph)
+    m = len(cgraph.targets)
+    targets = sorted(cgraph.index[t] for t in heuristic) if heuristic is not None else []
+    k = len(alt.landmarks) if alt is not None else 0
+    flags = _EDGE_NAMES if cgraph.names is not None else 0
+    if all(type(node_id) is int for node_id in cgraph.ids):
+        flags |= _INT_IDS
+    elif not all(isinstance(node_id, str) for node_id in cgraph.ids):
+        raise TypeError("node ids have to be all strings or all ints")
+    with open(filename, "wb") as f:
+        f.write(_MAGIC)
+        _pad(f)
+        f.write(_HEADER.pack(n, m, flags, len(targets), k))
+        _write_array(f, array("q", cgraph.offsets))
+        _write_array(f, array("i", cgraph.targets))
+        _write_array(f, array("d", cgraph.costs))
+        if flags & _INT_IDS:
+            _write_array(f, array("q", cgraph.ids))
+        else:
+            _write_strings(f, cgraph.ids)
+        if cgraph.names is not None:
+            _write_strings(f, cgraph.names)
+        if targets:
+            _write_array(f, array("q", targets))
+            values = array("d")
+            for t in targets:
+                row = heuristic[cgraph.ids[t]]
+                values.extend(row.get(node_id, 0.0) for node_id in cgraph.ids)
+            _write_array(f, values)
+        if alt is not None:
+            _write_array(f, array("q", (cgraph.index[alt.ids[i]] for i in alt.landmarks)))
+            order = [alt.index[node_id] for node_id in cgraph.ids]
+            for distances in (alt.forward, alt.backward):
+                _write_array(f, array("d", (distances[row*len(alt.ids) + i] for row in range(k) for i in order)))
+
+class GraphFile:
+    """
+    A graph file mapped into memory with mmap. All arrays are memoryviews of the mapping rather than copies, so opening a file
+    is fast regardless of its size, and processes that open the same file share its pages through the operating system's page
+    cache. Only the node ids are decoded up front (to build the id index of the graph).
+
+    graph is a graph.CompactGraph over the mapped arrays, so graph[node_id] can be passed to any of the search functions.
+    """
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder != "little":
+            raise ValueError("graph files can only be mapped on little endian machines")
+        view = memoryview(self.buffer)
+        if bytes(view[:4]) != _MAGIC:
+            raise ValueError("%s is not a graph file"%filename)
+        self.position = 8
+        n, m, flags, h, k = _HEADER.unpack_from(self.buffer, self.position)
+        self.position += _HEADER.size
+        offsets = self._array(view, "q", n+1)
+        targets = self._array(view, "i", m)
+        costs = self._array(view, "d", m)
+        ids = list(self._array(view, "q", n) if flags & _INT_IDS else self._strings(view, n))
+        names = self._strings(view, m) if flags & _EDGE_NAMES else None
+        self.graph = graph.CompactGraph(ids, offsets, targets, costs, names)
+        self.heuristic_targets = {}
+        self.heuristic_values = None
+        if h:
+            for (row, t) in enumerate(self._array(view, "q", h)):
+                self.heuristic_targets[ids[t]] = row
+            self.heuristic_values = self._array(view, "d", h*n)
+        self.alt = None
+        if k:
+            indices = list(self._array(view, "q", k))
+            forward = self._array(view, "d", k*n)
+            backward = self._array(view, "d", k*n)
+            self.alt = landmarks.Landmarks(ids, indices, forward, backward)
+    def _array(self, view, typecode, count):
+        size = count*struct.calcsize(typecode)
+        result = view[self.position:self.position+size].cast(typecode)
+        self.position += size + (-size % 8)
+        return result
+    def _strings(self, view, count):
+        offsets = self._array(view, "q", count+1)
+        size = offsets[-1]
+        data = view[self.position:self.position+size]
+        self.position += size + (-size % 8)
+        return StringTable(offsets, data)
+    def heuristic(self, target):
+        """
+        Returns a heuristic function for pathfinding.astar from the stored heuristic table, estimating the distance from a node to
+        the node with id target. Raises KeyError if the file has no heuristic for target.
+        """
+        start = self.heuristic_targets[target]*len(self.graph)
+        values = self.heuristic_values
+        index = self.graph.index
+        return lambda n: values[start + index[n.get_id()]]
+    def heuristic_table(self):
+        """
+        Returns the stored heuristic as a dictionary of dictionaries in the shape of graph.AustriaHeuristic.
+        """
+        ids = self.graph.ids
+        n = len(ids)
+        return {target: {node_id: self.heuristic_values[row*n + i] for (i, node_id) in enumerate(ids)}
+                for (target, row) in self.heuristic_targets.items()}
+
+def read_graph(filename):
+    """
+    Maps a graph file written by write_graph into memory and returns it as a GraphFile.
+    """
+    return GraphFile(filename)
+
+if __name__ == "__main__":
+    # Writes the example graphs of the graph module to graph files in the given directory (default: the current one), then reads
+    # them back and checks that the landmarks survive a round trip from the graph file through Landmarks.save and Landmarks.load.
+    import os
+    directory = sys.argv[1] if len(sys.argv) > 1 else "."
+    for (name, nodes, heuristic) in (("austria", graph.Austria, graph.AustriaHeuristic), ("china", graph.China, graph.ChinaHeruistic)):
+        filename = os.path.join(directory, name + ".graph")
+        alt = landmarks.build_landmarks(nodes, k=4)
+        write_graph(filename, nodes, heuristic, alt)
+        print("Wrote", filename, os.path.getsize(filename), "bytes")
+        mapped = read_graph(filename).alt
+        mapped.save(filename + ".alt")
+        loaded = landmarks.Landmarks.load(filename + ".alt")
+        os.remove(filename + ".alt")
+        same = all(alt.bounds(t) == mapped.bounds(t) == loaded.bounds(t) for t in nodes)
+        print("Landmark round trip", "ok" if same else "FAILED")
@@ -0,0 +1,109 @@
+import json
+import struct
+from array import array
+
+import numpy as np
+
+import distances
+
+_MAGIC = b"ALT1"
+
+class Landmarks:
+    """
+    Landmark (ALT) distances of a finite graph. For each of the k landmarks L, forward holds d(L,v) and backward holds d(v,L) 
+    for every node v, stored as one float64 array of k*n values each (row per landmark, columns in the node order of ids).
+    
+    By the triangle inequality, max over L of d(L,t)-d(L,v) and d(v,L)-d(t,L) is a lower bound on d(v,t), which gives an 
+    admissible and consistent heuristic for any target t, see heuristic().
+    """
+    def __init__(self, ids, landmarks, forward, backward):
+        self.ids = ids
+        self.index = {node_id: i for (i, node_id) in enumerate(ids)}
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+    def _arrays(self):
+        shape = (len(self.landmarks), len(self.ids))
+        return np.frombuffer(self.forward, dtype=np.float64).reshape(shape), np.frombuffer(self.backward, dtype=np.float64).reshape(shape)
+    def bounds(self, target):
+        """
+        Returns a list with the ALT lower bound on the distance from every node (in the order of ids) to the node with id target.
+        """
+        forward, backward = self._arrays()
+        t = self.index[target]
+        with np.errstate(invalid="ignore"):
+            bound = np.maximum(forward[:, t:t+1] - forward, backward - backward[:, t:t+1])
+        bound = np.where(np.isnan(bound), 0.0, bound).max(axis=0)
+        return np.maximum(bound, 0.0).tolist()
+    def heuristic(self, target):
+        """
+        Returns a heuristic function for pathfinding.astar, estimating the distance from a node to the node with id target.
+        """
+        bound = self.bounds(target)
+        index = self.index
+        return lambda n: bound[index[n.get_id()]]
+    def save(self, filename):
+        """
+        Writes the landmark data to a binary file: a header with the magic bytes, n, k and the length of the JSON encoded node ids,
+        followed by the ids, the landmark indices (int32) and the forward and backward arrays (float64). forward and backward can be
+        any float64 buffers, e.g. the memoryviews of a landmarks section of a graphfile.GraphFile.
+        """
+        ids = json.dumps(self.ids).encode("utf-8")
+        with open(filename, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<qqq", len(self.ids), len(self.landmarks), len(ids)))
+            f.write(ids)
+            array("i", self.landmarks).tofile(f)
+            f.write(memoryview(self.forward).cast("B"))
+            f.write(memoryview(self.backward).cast("B"))
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads landmark data written by save().
+        """
+        with open(filename, "rb") as f:
+            if f.read(4) != _MAGIC:
+                raise ValueError("%s is not a landmark file"%filename)
+            n, k, size = struct.unpack("<qqq", f.read(24))
+            ids = json.loads(f.read(size).decode("utf-8"))
+            landmarks = array("i")
+            landmarks.fromfile(f, k)
+            forward = array("d")
+            forward.fromfile(f, k*n)
+            backward = array("d")
+            backward.fromfile(f, k*n)
+        return cls(ids, list(landmarks), forward, backward)
+
+def build_landmarks(nodes, k=8, first=None):
+    """
+    Selects k landmarks with farthest-point selection and computes their forward and backward distances. nodes is a 
+    graph.CompactGraph or a graph of Node objects, e.g. the result of graph.make_geom_graph.
+    
+    The first landmark is the node farthest from first (a node id, default the first node of the graph), every further landmark is 
+    the node that maximizes the smallest round trip distance d(L,v)+d(v,L) to the landmarks chosen so far. Unreachable nodes are never picked.
+    """
+    cgraph = distances.compile_graph(nodes)
+    n = len(cgraph)
+    k = min(k, n)
+    forward_arrays = distances.csr_arrays(cgraph)
+    backward_arrays = distances.csr_arrays(cgraph.reverse())
+    start = 0 if first is None else cgraph.index[first]
+    seed = distances.relax_batch(forward_arrays, n, [start])[:, 0]
+    spread = np.where(np.isinf(seed), -1.0, seed)
+    landmarks = []
+    forward = array("d")
+    backward = array("d")
+    closest = None
+    while len(landmarks) < k:
+        candidate = int(np.argmax(spread if closest is None else closest))
+        if candidate in landmarks:
+            break
+        landmarks.append(candidate)
+        to_all = distances.relax_batch(forward_arrays, n, [candidate])[:, 0]
+        from_all = distances.relax_batch(backward_arrays, n, [candidate])[:, 0]
+        forward.frombytes(to_all.tobytes())
+        backward.frombytes(from_all.tobytes())
+        round_trip = to_all + from_all
+        round_trip = np.where(np.isinf(round_trip), -1.0, round_trip)
+        closest = round_trip if closest is None else np.minimum(closest, round_trip)
+    return Landmarks(list(cgraph.ids), landmarks, forward, backward)
@@ -1,5 +1,9 @@
 import graph
-from queue import PriorityQueue
+import time
+from heapq import heapify, heappush, heappop
+from operator import methodcaller
+
+_get_neighbors = methodcaller("get_neighbors")
 
 def default_heuristic(n):
     """
@@ -7,11 +11,179 @@ def default_heuristic(n):
     """
     return 0
 
-def bfs(start, goal):
+def _reconstruct(parents, node_id):
+    """
+    Follows the parent pointers from node_id back to the start and returns the list of graph.Edge objects in traversal order.
+    parents maps a node id to a (parent id, edge) pair, the start node maps to None.
+    """
+    path = []
+    entry = parents[node_id]
+    while entry is not None:
+        parent_id, edge = entry
+        path.append(edge)
+        entry = parents[parent_id]
+    path.reverse()
+    return path
+
+def _search(start, goal, priority, improve=False, early_goal=False, stats=None):
+    """
+    Shared best-first search kernel used by bfs, dfs, greedy and astar.
+
+    The frontier is a heapq of (key, counter, cost, node) tuples. priority is called as priority(cost, node, counter) and returns the key,
+    the counter breaks ties so nodes are never compared with each other. Closed nodes are kept in a set and the best known cost and parent
+    pointer of every discovered node in dicts, all keyed by get_id().
+
+    If improve is True a node that was already discovered is pushed again when a cheaper way to reach it is found (lazy decrease-key,
+    outdated frontier entries are skipped when they are popped). Otherwise the first discovery of a node is final.
+
+    If early_goal is True the goal predicate is tested when a node is discovered, otherwise when it is removed from the frontier.
+    
+    stats is an optional profiling.SearchStats that records what the search spends its time on. When it is given, the goal predicate, 
+    get_neighbors and the frontier operations are swapped for instrumented versions, so a search without it runs the plain code.
+
+    Returns the usual 4-tuple (path,distance,visited,expanded).
+    """
+    push = heappush
+    pop = heappop
+    neighbors = _get_neighbors
+    if stats is not None:
+        goal = stats.timed("goal", goal)
+        neighbors = stats.timed("neighbors", neighbors)
+        push = stats.push
+        pop = stats.pop
+    start_id = start.get_id()
+    parents = {start_id: None}
+    costs = {start_id: 0}
+    closed = set()
+    counter = 0
+    frontier = []
+    push(frontier, (priority(0, start, counter), counter, 0, start))
+    visited = 1
+    expanded = 0
+    if early_goal and goal(start):
+        return [], 0, visited, expanded
+    while frontier:
+        _, _, cost, current = pop(frontier)
+        current_id = current.get_id()
+        if current_id in closed or cost > costs[current_id]:
+            continue
+        if not early_goal and goal(current):
+            if stats is not None:
+                stats.closed += len(closed)
+            return _reconstruct(parents, current_id), cost, visited, expanded
+        closed.add(current_id)
+        expanded += 1
+        for edge in neighbors(current):
+            target = edge.target
+            target_id = target.get_id()
+            if target_id in closed:
+                continue
+            new_cost = cost + edge.cost
+            known = costs.get(target_id)
+            if known is not None and (not improve or new_cost >= known):
+                continue
+            if known is not None and stats is not None:
+                stats.reopened += 1
+            costs[target_id] = new_cost
+            parents[target_id] = (current_id, edge)
+            visited += 1
+            if early_goal and goal(target):
+                if stats is not None:
+                    stats.closed += len(closed)
+                return _reconstruct(parents, target_id), new_cost, visited, expanded
+            counter += 1
+            push(frontier, (priority(new_cost, target, counter), counter, new_cost, target))
+    if stats is not None:
+        stats.closed += len(closed)
+    return [], 0, visited, expanded
+
+def _search_compact(cgraph, source, goal, priority, improve=False, early_goal=False, stats=None):
+    """
+    Same as _search, but runs directly on a graph.CompactGraph: nodes are the dense int indices of the graph and neighbors are read from 
+    its CSR arrays, so no Node or Edge objects are created during the search. goal and priority are called with int indices as well.
+    Edge objects are only built for the edges of the returned path. stats records no neighbor timings, since there are no get_neighbors calls.
+    """
+    push = heappush
+    pop = heappop
+    if stats is not None:
+        goal = stats.timed("goal", goal)
+        push = stats.push
+        pop = stats.pop
+    offsets = cgraph.offsets
+    targets = cgraph.targets
+    edge_costs = cgraph.costs
+    parents = {source: None}
+    costs = {source: 0.0}
+    closed = set()
+    counter = 0
+    frontier = []
+    push(frontier, (priority(0.0, source, counter), counter, 0.0, source))
+    visited = 1
+    expanded = 0
+    if early_goal and goal(source):
+        return [], 0, visited, expanded
+    while frontier:
+        _, _, cost, current = pop(frontier)
+        if current in closed or cost > costs[current]:
+            continue
+        if not early_goal and goal(current):
+            if stats is not None:
+                stats.closed += len(closed)
+            return _reconstruct_compact(cgraph, parents, current), cost, visited, expanded
+        closed.add(current)
+        expanded += 1
+        for e in range(offsets[current], offsets[current+1]):
+            target = targets[e]
+            if target in closed:
+                continue
+            new_cost = cost + edge_costs[e]
+            known = costs.get(target)
+            if known is not None and (not improve or new_cost >= known):
+                continue
+            if known is not None and stats is not None:
+                stats.reopened += 1
+            costs[target] = new_cost
+            parents[target] = (current, e)
+            visited += 1
+            if early_goal and goal(target):
+                if stats is not None:
+                    stats.closed += len(closed)
+                return _reconstruct_compact(cgraph, parents, target), new_cost, visited, expanded
+            counter += 1
+            push(frontier, (priority(new_cost, target, counter), counter, new_cost, target))
+    if stats is not None:
+        stats.closed += len(closed)
+    return [], 0, visited, expanded
+
+def _reconstruct_compact(cgraph, parents, index):
+    """
+    Like _reconstruct, but parents maps int indices to (parent index, edge index) pairs, and the Edge objects are built from cgraph.
+    """
+    path = []
+    entry = parents[index]
+    while entry is not None:
+        parent, e = entry
+        path.append(cgraph.edge(parent, e))
+        entry = parents[parent]
+    path.reverse()
+    return path
+
+def _on_nodes(cgraph, f):
+    """
+    Adapts a function on Node objects (a goal predicate or a heuristic) to the int indices used by _search_compact.
+    A single CompactNode view is reused for all calls, so f must not keep a reference to the node it is passed.
+    """
+    view = graph.CompactNode(cgraph, 0)
+    def on_index(i):
+        view.index = i
+        return f(view)
+    return on_index
+
+def bfs(start, goal, stats=None):
     """
     Breadth-First search algorithm. The function is passed a start graph.Node object and a goal predicate.
     
-    The start node can produce neighbors as needed, see graph.py for details.
+    The start node can produce neighbors as needed, see graph.py for details. If it is a graph.CompactNode, the search runs directly on the arrays of its CompactGraph.
     
     The goal is represented as a function, that is passed a node, and returns True if that node is a goal node, otherwise False. 
     
@@ -20,43 +192,18 @@ def bfs(start, goal):
         - distance is the sum of costs of all edges in the path 
         - visited is the total number of nodes that were added to the frontier during the execution of the algorithm 
         - expanded is the total number of nodes that were expanded, i.e. removed from the frontier to add their neighbors
-    """
-    Frontier = []
-    visited = []
-    path = []
-    Frontier.append(start)
-    visited.append(start.get_id())
-    dis = 0
-    visited_counter = 1
-    expanded = 0
-    while Frontier:
-        current = Frontier.pop()
-        if goal(current):
-            return path, dis, visited_counter, expanded
-        expanded += 1
-        for neighbor in current.get_neighbors():
-            if neighbor.target.get_id in visited:continue
-            dis += neighbor.cost
-            visited_counter += 1
-            path.append(neighbor)
-            #print ("visiting: ", neighbor.target )
-            if goal(neighbor.target):
-                #print("goal is found ", neighbor.target.name)
-                return path, dis, visited_counter, expanded
-
-            Frontier.append(neighbor.target)
-            #print("frontier appended ",neighbor.target.name)
-            visited.append(neighbor.target.get_id)
-
-
-
 
+    stats is an optional profiling.SearchStats object that collects call counts and timings, see profiling.py.
+    """
+    if isinstance(start, graph.CompactNode):
+        return _search_compact(start.graph, start.index, _on_nodes(start.graph, goal), lambda cost, node, counter: counter, early_goal=True, stats=stats)
+    return _search(start, goal, lambda cost, node, counter: counter, early_goal=True, stats=stats)
 
-def dfs(start, goal):
+def dfs(start, goal, stats=None):
     """
     Depth-First search algorithm. The function is passed a start graph.Node object, a heuristic function, and a goal predicate.
 
-    The start node can produce neighbors as needed, see graph.py for details.
+    The start node can produce neighbors as needed, see graph.py for details. If it is a graph.CompactNode, the search runs directly on the arrays of its CompactGraph.
 
     The goal is represented as a function, that is passed a node, and returns True if that node is a goal node, otherwise False.
 
@@ -65,52 +212,18 @@ def dfs(start, goal):
         - distance is the sum of costs of all edges in the path
         - visited is the total number of nodes that were added to the frontier during the execution of the algorithm
         - expanded is the total number of nodes that were expanded, i.e. removed from the frontier to add their neighbors
-    """
-    Frontier = []
-    visited = []
-    path = []
-    Frontier.append(start)
-    visited.append(start.get_id())
-    dis = 0
-    visited_counter = 1
-    expanded = 0
-    while Frontier:
-
-        neighbors = Frontier.pop()
-
-        if neighbors is not start:
-
-            dis += neighbors[2]
-            path.append(neighbors[1])
-            neighbors=neighbors[0].get_neighbors()
-
-        else:
-            neighbors=neighbors.get_neighbors()
-
-        expanded += 1
-        for neighbor in neighbors:
-
-            if neighbor.target.get_id() not in visited:
-
-                Frontier.append([neighbor.target,neighbor,neighbor.cost])
-                visited.append(neighbor.target.get_id())
-                visited_counter += 1
-            if goal(neighbor.target):
-
-                dis+=neighbor.cost
-                path.append(neighbor)
-                visited_counter += 1
-                return path,dis,visited_counter,expanded
-
-   # return path, dis, visited, expanded
-
 
+    stats is an optional profiling.SearchStats object that collects call counts and timings, see profiling.py.
+    """
+    if isinstance(start, graph.CompactNode):
+        return _search_compact(start.graph, start.index, _on_nodes(start.graph, goal), lambda cost, node, counter: -counter, early_goal=True, stats=stats)
+    return _search(start, goal, lambda cost, node, counter: -counter, early_goal=True, stats=stats)
 
-def greedy(start, heuristic, goal):
+def greedy(start, heuristic, goal, stats=None):
     """
     Greedy search algorithm. The function is passed a start graph.Node object, a heuristic function, and a goal predicate.
     
-    The start node can produce neighbors as needed, see graph.py for details.
+    The start node can produce neighbors as needed, see graph.py for details. If it is a graph.CompactNode, the search runs directly on the arrays of its CompactGraph.
     
     The heuristic is a function that takes a node as a parameter and returns an estimate for how far that node is from the goal.    
     
@@ -121,53 +234,21 @@ def greedy(start, heuristic, goal):
         - distance is the sum of costs of all edges in the path 
         - visited is the total number of nodes that were added to the frontier during the execution of the algorithm 
         - expanded is the total number of nodes that were expanded, i.e. removed from the frontier to add their neighbors
-    """
-    frontier = PriorityQueue()
-    priority = heuristic(start)
-    expanded = []
-    path = []
-    visited = []
-    expand_counter = 0
-    visited_counter = 1
-    total_distance = 0
-    frontier.put((priority, visited_counter, start))
-    expanded.append(start.get_id())
-    visited.append(start.get_id())
-
-    while not frontier.empty():
-
-        pop_from_frontier = frontier.get()
-        expand_node = pop_from_frontier[2]
-        expand_counter += 1
-
-        expanded.append(expand_node.get_id())
-        if expand_node is not start:
-            path.append(pop_from_frontier[4])
-            total_distance += pop_from_frontier[3]
-
-        neighbors = expand_node.get_neighbors()
-        for neighbor in neighbors:
-            next = neighbor.target
-            if goal(next):
-                path.append(neighbor)
-                total_distance += neighbor.cost
-                return path, total_distance, visited_counter, expand_counter
-
-            if next.get_id() not in visited or next.get_id() not in expanded:
-                priority = heuristic(next)
-                frontier.put((priority, visited_counter, next,neighbor.cost,neighbor))
-                visited.append(next.get_id())
-                visited_counter += 1
-
-    return path, total_distance, visited_counter, expand_counter
-
-    
 
-def astar(start, heuristic, goal):
+    stats is an optional profiling.SearchStats object that collects call counts and timings, see profiling.py.
+    """
+    if stats is not None:
+        heuristic = stats.timed("heuristic", heuristic)
+    if isinstance(start, graph.CompactNode):
+        h = _on_nodes(start.graph, heuristic)
+        return _search_compact(start.graph, start.index, _on_nodes(start.graph, goal), lambda cost, node, counter: h(node), early_goal=True, stats=stats)
+    return _search(start, goal, lambda cost, node, counter: heuristic(node), early_goal=True, stats=stats)
+
+def astar(start, heuristic, goal, stats=None):
     """
     A* search algorithm. The function is passed a start graph.Node object, a heuristic function, and a goal predicate.
     
-    The start node can produce neighbors as needed, see graph.py for details.
+    The start node can produce neighbors as needed, see graph.py for details. If it is a graph.CompactNode, the search runs directly on the arrays of its CompactGraph.
     
     The heuristic is a function that takes a node as a parameter and returns an estimate for how far that node is from the goal.    
     
@@ -178,84 +259,571 @@ def astar(start, heuristic, goal):
         - distance is the sum of costs of all edges in the path 
         - visited is the total number of nodes that were added to the frontier during the execution of the algorithm 
         - expanded is the total number of nodes that were expanded, i.e. removed from the frontier to add their neighbors
+
+    stats is an optional profiling.SearchStats object that collects call counts and timings, see profiling.py.
     """
-    frontier = PriorityQueue()
-    priority = heuristic(start)
-    expanded = []
-    path = []
-    visited = []
-    minimal_distance = 0
-    expand_counter = 0
-    visited_counter = 1
-    total_minimal_distance = 0
-    frontier.put((priority, 0,start, minimal_distance))
-    expanded.append(start.get_id())
-    visited.append(start.get_id())
-
-    while not frontier.empty():
-
-        pop_from_frontier = frontier.get()
-        expand_node = pop_from_frontier[2]
-        expand_counter +=1
-        minimal_distance = pop_from_frontier[3] + minimal_distance
-        expanded.append(expand_node.get_id())
-        if expand_node is not start:
-            path.append(pop_from_frontier[4])
-
-        neighbors=expand_node.get_neighbors()
-        for neighbor in neighbors:
-
-                next = neighbor.target
-                if goal(next):
-                    path.append(neighbor)
-                    total_minimal_distance=minimal_distance+neighbor.cost
-                    return path, total_minimal_distance, visited_counter, expand_counter
-
-                if next.get_id() not in visited or next.get_id() not in expanded:
-                    priority = neighbor.cost + heuristic(next)
-
-                    frontier.put((priority,visited_counter, next, neighbor.cost,neighbor))
-                    visited.append(next.get_id())
-                    visited_counter+=1
-
-    return path,total_minimal_distance,visited_counter,expand_counter
+    if stats is not None:
+        heuristic = stats.timed("heuristic", heuristic)
+    if isinstance(start, graph.CompactNode):
+        h = _on_nodes(start.graph, heuristic)
+        return _search_compact(start.graph, start.index, _on_nodes(start.graph, goal), lambda cost, node, counter: cost + h(node), improve=True, stats=stats)
+    return _search(start, goal, lambda cost, node, counter: cost + heuristic(node), improve=True, stats=stats)
     
-def run_all(name, start, heuristic, goal):
-    print("running test", name)
-    print("Breadth-First Search")
-
-    result = bfs(start, goal)
-    print_path(result)
-
-    print("\nDepth-First Search")
-    result = dfs(start, goal)
-    print_path(result)
-
-    print("\nGreedy Search (default heuristic)")
-    result = greedy(start, default_heuristic, goal)
-    print_path(result)
+def _join(forward_parents, backward_parents, meet_id):
+    """
+    Builds the path of a bidirectional search that met in the node with id meet_id. forward_parents is the parent map of the forward 
+    search (see _reconstruct), backward_parents maps a node id to (successor id, successor node, predecessor edge) for the backward search.
+    The backward half is turned into forward pointing graph.Edge objects.
+    """
+    path = _reconstruct(forward_parents, meet_id)
+    entry = backward_parents[meet_id]
+    while entry is not None:
+        successor_id, successor, edge = entry
+        path.append(graph.Edge(successor, edge.cost, edge.name))
+        entry = backward_parents[successor_id]
+    return path
+
+def bidirectional_bfs(start, target):
+    """
+    Bidirectional Breadth-First search from the start node to the target node (a graph.Node, not a predicate). The target has to 
+    implement get_predecessors(), see graph.py. The side with the smaller frontier is expanded one full level at a time, until a 
+    node is discovered by both sides. The path found has the smallest number of edges, not necessarily the smallest cost.
     
-    print("\nGreedy Search")
-    result = greedy(start, heuristic, goal)
-    print_path(result)
+    Returns the same 4-tuple (path,distance,visited,expanded) as bfs.
+    """
+    start_id = start.get_id()
+    target_id = target.get_id()
+    if start_id == target_id:
+        return [], 0, 1, 0
+    parents = ({start_id: None}, {target_id: None})
+    depths = ({start_id: 0}, {target_id: 0})
+    frontiers = ([start], [target])
+    visited = 2
+    expanded = 0
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own_parents = parents[side]
+        own_depths = depths[side]
+        other_depths = depths[1-side]
+        best = None
+        level = []
+        for current in frontiers[side]:
+            current_id = current.get_id()
+            expanded += 1
+            edges = current.get_neighbors() if side == 0 else current.get_predecessors()
+            for edge in edges:
+                next_id = edge.target.get_id()
+                if next_id in own_parents:
+                    continue
+                own_parents[next_id] = (current_id, edge) if side == 0 else (current_id, current, edge)
+                own_depths[next_id] = own_depths[current_id] + 1
+                visited += 1
+                level.append(edge.target)
+                if next_id in other_depths:
+                    hops = own_depths[next_id] + other_depths[next_id]
+                    if best is None or hops < best[0]:
+                        best = (hops, next_id)
+        if best is not None:
+            path = _join(parents[0], parents[1], best[1])
+            return path, sum(e.cost for e in path), visited, expanded
+        frontiers = (level, frontiers[1]) if side == 0 else (frontiers[0], level)
+    return [], 0, visited, expanded
+
+def bidirectional_astar(start, heuristic, target, reverse_heuristic=default_heuristic):
+    """
+    Bidirectional A* search from the start node to the target node (a graph.Node that implements get_predecessors(), see graph.py).
     
-    print("\nA* Search (default heuristic)")
-    result = astar(start, default_heuristic, goal)
-    print_path(result)
-
-
-    print("\nA* Search")
-    result = astar(start, heuristic, goal)
-    print_path(result)
-
-
-
+    heuristic estimates the distance from a node to the target and guides the forward search, reverse_heuristic estimates the distance
+    from the start to a node and guides the backward search. With the default heuristics both sides are Dijkstra searches. 
+    
+    Both sides use the average potential p(n) = (heuristic(n) - reverse_heuristic(n))/2, the forward frontier is ordered by g(n)+p(n) and the
+    backward frontier by g(n)-p(n). Both searches then behave like Dijkstra on the same graph with reduced edge costs, so the side with 
+    the smaller frontier can be advanced one node at a time. Whenever an edge connects the two searches, the best known path cost mu is 
+    updated, and the search stops as soon as the smallest keys of the two frontiers add up to at least mu. This keeps the result optimal 
+    for weighted edges as long as both heuristics are consistent.
+    
+    Returns the same 4-tuple (path,distance,visited,expanded) as astar.
+    """
+    start_id = start.get_id()
+    target_id = target.get_id()
+    potentials = (lambda n: (heuristic(n) - reverse_heuristic(n))/2, lambda n: (reverse_heuristic(n) - heuristic(n))/2)
+    parents = ({start_id: None}, {target_id: None})
+    costs = ({start_id: 0}, {target_id: 0})
+    closed = (set(), set())
+    frontiers = ([(potentials[0](start), 0, 0, start)], [(potentials[1](target), 0, 0, target)])
+    counter = 0
+    best = 0 if start_id == target_id else float("inf")
+    meet_id = start_id if start_id == target_id else None
+    visited = 2
+    expanded = 0
+    while frontiers[0] and frontiers[1]:
+        if frontiers[0][0][0] + frontiers[1][0][0] >= best:
+            break
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        frontier = frontiers[side]
+        own_costs = costs[side]
+        other_costs = costs[1-side]
+        _, _, cost, current = heappop(frontier)
+        current_id = current.get_id()
+        if current_id in closed[side] or cost > own_costs[current_id]:
+            continue
+        closed[side].add(current_id)
+        expanded += 1
+        edges = current.get_neighbors() if side == 0 else current.get_predecessors()
+        for edge in edges:
+            next = edge.target
+            next_id = next.get_id()
+            if next_id in closed[side]:
+                continue
+            new_cost = cost + edge.cost
+            known = own_costs.get(next_id)
+            if known is not None and new_cost >= known:
+                continue
+            own_costs[next_id] = new_cost
+            parents[side][next_id] = (current_id, edge) if side == 0 else (current_id, current, edge)
+            visited += 1
+            if next_id in other_costs and new_cost + other_costs[next_id] < best:
+                best = new_cost + other_costs[next_id]
+                meet_id = next_id
+            counter += 1
+            heappush(frontier, (new_cost + potentials[side](next), counter, new_cost, next))
+    if meet_id is None:
+        return [], 0, visited, expanded
+    return _join(parents[0], parents[1], meet_id), best, visited, expanded
+    
+def idastar(start, heuristic, goal, table_size=100000):
+    """
+    Iterative deepening A* (IDA*). Same arguments and 4-tuple (path,distance,visited,expanded) as astar, but memory use is bounded: 
+    each iteration is a depth-first search that cuts off every node with cost + heuristic above a bound, and the next iteration raises
+    the bound to the smallest value that was cut off.
+    
+    Besides the current path, the only stored data is a transposition table with the cheapest cost at which each node id was reached
+    in the current iteration, so that nodes reached again on a more expensive path are not expanded twice. It keeps at most table_size
+    entries and drops the oldest ones when full. visited and expanded add up over all iterations.
+    
+    An infinite heuristic value (e.g. from landmarks.Landmarks.heuristic when the goal is unreachable) prunes a node for good: the
+    search fails right away if the start has one, and such successors are neither expanded nor used for the next bound.
+    """
+    start_id = start.get_id()
+    visited = 1
+    expanded = 0
+    if goal(start):
+        return [], 0, visited, expanded
+    bound = heuristic(start)
+    if bound == float("inf"):
+        return [], 0, visited, expanded
+    while True:
+        cut_off = float("inf")
+        table = {start_id: 0}
+        on_path = {start_id}
+        path = []
+        expanded += 1
+        stack = [(start_id, 0, iter(start.get_neighbors()))]
+        while stack:
+            current_id, cost, edges = stack[-1]
+            edge = next(edges, None)
+            if edge is None:
+                stack.pop()
+                on_path.discard(current_id)
+                if path:
+                    path.pop()
+                continue
+            target = edge.target
+            target_id = target.get_id()
+            if target_id in on_path:
+                continue
+            new_cost = cost + edge.cost
+            known = table.get(target_id)
+            if known is not None and known <= new_cost:
+                continue
+            visited += 1
+            f = new_cost + heuristic(target)
+            if f == float("inf"):
+                continue
+            if f > bound:
+                if f < cut_off:
+                    cut_off = f
+                continue
+            if known is None and len(table) >= table_size:
+                del table[next(iter(table))]
+            table[target_id] = new_cost
+            path.append(edge)
+            if goal(target):
+                return path, new_cost, visited, expanded
+            on_path.add(target_id)
+            expanded += 1
+            stack.append((target_id, new_cost, iter(target.get_neighbors())))
+        if cut_off == float("inf"):
+            return [], 0, visited, expanded
+        bound = cut_off
+
+class _SMANode:
+    """
+    Node of the search tree kept by smastar. forgotten maps the ids of dropped children to their backed up f-values.
+    """
+    __slots__ = ("node", "node_id", "parent", "edge", "cost", "f", "depth", "children", "forgotten", "version")
+    def __init__(self, node, parent, edge, cost, f):
+        self.node = node
+        self.node_id = node.get_id()
+        self.parent = parent
+        self.edge = edge
+        self.cost = cost
+        self.f = f
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.children = {}
+        self.forgotten = {}
+        self.version = 0
+
+def smastar(start, heuristic, goal, max_nodes=10000):
+    """
+    Simplified memory-bounded A* (SMA*). Same arguments and 4-tuple (path,distance,visited,expanded) as astar, but the search tree 
+    never holds more than max_nodes nodes.
+    
+    Like A* the leaf with the lowest f-value (the deepest one on ties) is expanded next. When the tree is full, the leaf with the 
+    highest f-value (the shallowest one on ties) is dropped and its f-value is remembered by its parent. The parent then competes with 
+    the leaves with the best remembered value, and regenerates the forgotten children when it is chosen. f-values are backed up from 
+    children to parents, so a parent always carries the best f-value of its subtree. A successor that is already in the tree with a
+    cost at most as high is not generated again, and of several edges to the same successor only the cheapest one is used (self-loops
+    are skipped). A node whose path from the start and successors do not fit into max_nodes is treated as a dead end. The result is 
+    optimal if the heuristic is admissible and max_nodes is large enough to hold an optimal path together with the successors of its 
+    nodes, otherwise it is the best solution that fits into memory, or no path at all. benchmark.memory_bounded_check compares it 
+    with astar on the infinite graph for small values of max_nodes.
+    
+    Every change of a node queues it again and outdated heap entries are skipped when they are popped. Only the newest entry of a
+    node in the tree is valid, so whenever a heap holds more than twice as many entries as there are nodes in the tree it is rebuilt
+    from its valid entries. Together with the tree itself, the in_tree index and the forgotten values (at most one per successor of a
+    node in the tree) the memory used is therefore O(max_nodes) for graphs with a bounded number of successors per node.
+    """
+    inf = float("inf")
+    root = _SMANode(start, None, None, 0, heuristic(start))
+    best = []
+    worst = []
+    counter = 0
+    stored = 1
+    visited = 1
+    expanded = 0
+    in_tree = {root.node_id: root}
+    def candidate(n):
+        """
+        Re-queues n after it changed: leaves are queued with their f-value, nodes with forgotten children with the best forgotten value.
+        """
+        nonlocal counter
+        n.version += 1
+        counter += 1
+        if not n.children:
+            heappush(best, (n.f, -n.depth, counter, n.version, n))
+            heappush(worst, (-n.f, n.depth, counter, n.version, n))
+        elif n.forgotten:
+            heappush(best, (min(n.forgotten.values()), -n.depth, counter, n.version, n))
+    def valid(entry):
+        n = entry[-1]
+        return entry[-2] == n.version and (n.parent is None or n.parent.children.get(n.node_id) is n)
+    def backup(n):
+        while n is not None:
+            values = [c.f for c in n.children.values()] + list(n.forgotten.values())
+            f = min(values) if values else inf
+            if f == n.f:
+                return
+            n.f = f
+            n = n.parent
+    candidate(root)
+    while best:
+        entry = heappop(best)
+        if not valid(entry):
+            continue
+        if entry[0] == inf:
+            break
+        current = entry[-1]
+        if not current.children and goal(current.node):
+            path = []
+            n = current
+            while n.parent is not None:
+                path.append(n.edge)
+                n = n.parent
+            path.reverse()
+            return path, current.cost, visited, expanded
+        expanded += 1
+        ancestors = set()
+        n = current.parent
+        while n is not None:
+            ancestors.add(n.node_id)
+            n = n.parent
+        edges = {}
+        for edge in current.node.get_neighbors():
+            target_id = edge.target.get_id()
+            if target_id == current.node_id or target_id in ancestors or target_id in current.children:
+                continue
+            if current.children and target_id not in current.forgotten:
+                continue
+            duplicate = in_tree.get(target_id)
+            if duplicate is not None and duplicate.cost <= current.cost + edge.cost and target_id not in current.forgotten:
+                continue
+            if target_id in edges and edges[target_id].cost <= edge.cost:
+                continue
+            edges[target_id] = edge
+        if current.depth + 1 + len(current.children) + len(edges) > max_nodes:
+            edges = {}
+        for edge in edges.values():
+            target_id = edge.target.get_id()
+            cost = current.cost + edge.cost
+            f = max(current.f, cost + heuristic(edge.target))
+            if target_id in current.forgotten:
+                f = max(f, current.forgotten[target_id])
+            child = _SMANode(edge.target, current, edge, cost, f)
+            current.children[target_id] = child
+            duplicate = in_tree.get(target_id)
+            if duplicate is None or duplicate.cost > cost:
+                in_tree[target_id] = child
+            visited += 1
+            stored += 1
+            candidate(child)
+        if edges or not current.children:
+            current.forgotten.clear()
+        else:
+            for target_id in current.forgotten:
+                current.forgotten[target_id] = inf
+        if not current.children:
+            current.f = inf
+        current.version += 1
+        candidate(current)
+        backup(current.parent if not current.children else current)
+        while stored > max_nodes and worst:
+            entry = heappop(worst)
+            if not valid(entry):
+                continue
+            leaf = entry[-1]
+            if leaf.parent is None:
+                heappush(worst, entry)
+                break
+            parent = leaf.parent
+            del parent.children[leaf.node_id]
+            if in_tree.get(leaf.node_id) is leaf:
+                del in_tree[leaf.node_id]
+            parent.forgotten[leaf.node_id] = leaf.f
+            stored -= 1
+            backup(parent)
+            candidate(parent)
+        for heap in (best, worst):
+            if len(heap) > 2*stored + 16:
+                heap[:] = [entry for entry in heap if valid(entry)]
+                heapify(heap)
+    return [], 0, visited, expanded
+
+def anytime_astar(start, heuristic, goal, weight=3.0, step=0.5, time_limit=None, max_expansions=None):
+    """
+    Anytime repairing A* (ARA*). A generator that yields pairs (result, bound) with progressively better solutions, where result is 
+    the usual 4-tuple (path,distance,visited,expanded) and bound is a factor by which the distance is at most longer than optimal 
+    (assuming an admissible heuristic). A new pair is yielded whenever the distance or the bound improved. A bound of 1 means the 
+    solution is optimal, after which the generator stops.
+    
+    The first solution comes from weighted A*, ordering the frontier by cost + weight*heuristic, which finds a path quickly. The weight
+    is then lowered by step (down to 1) and the search continues from its previous state instead of restarting: nodes whose cost 
+    improved after they were expanded are kept aside and put back into the frontier for the next iteration only.
+    
+    time_limit (seconds) and max_expansions limit the total work. When either is exhausted the generator stops, so a caller with a 
+    deadline can simply keep the last solution it received. visited and expanded count the work of all iterations so far.
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    start_id = start.get_id()
+    parents = {start_id: None}
+    costs = {start_id: 0}
+    estimates = {start_id: heuristic(start)}
+    open_nodes = {start_id: start}
+    closed = set()
+    inconsistent = {}
+    visited = 1
+    expanded = 0
+    counter = 0
+    best_id = start_id if goal(start) else None
+    best_cost = 0 if best_id is not None else float("inf")
+    reported = None
+    proven = float("inf")
+    while True:
+        frontier = []
+        for (node_id, node) in open_nodes.items():
+            counter += 1
+            frontier.append((costs[node_id] + weight*estimates[node_id], counter, costs[node_id], node))
+        heapify(frontier)
+        exhausted = False
+        while frontier and frontier[0][0] < best_cost:
+            if (max_expansions is not None and expanded >= max_expansions) or (deadline is not None and time.perf_counter() > deadline):
+                exhausted = True
+                break
+            _, _, cost, current = heappop(frontier)
+            current_id = current.get_id()
+            if current_id in closed or cost > costs[current_id]:
+                continue
+            del open_nodes[current_id]
+            closed.add(current_id)
+            expanded += 1
+            for edge in current.get_neighbors():
+                target = edge.target
+                target_id = target.get_id()
+                new_cost = cost + edge.cost
+                known = costs.get(target_id)
+                if known is not None and new_cost >= known:
+                    continue
+                costs[target_id] = new_cost
+                parents[target_id] = (current_id, edge)
+                if known is None:
+                    estimates[target_id] = heuristic(target)
+                    visited += 1
+                if goal(target) and new_cost < best_cost:
+                    best_id = target_id
+                    best_cost = new_cost
+                if target_id in closed:
+                    inconsistent[target_id] = target
+                else:
+                    open_nodes[target_id] = target
+                    counter += 1
+                    heappush(frontier, (new_cost + weight*estimates[target_id], counter, new_cost, target))
+        if best_id is not None:
+            pending = [costs[node_id] + estimates[node_id] for node_id in open_nodes] + [costs[node_id] + estimates[node_id] for node_id in inconsistent]
+            lower = min(pending, default=best_cost)
+            if not exhausted:
+                proven = weight
+            bound = proven
+            if lower > 0:
+                bound = min(bound, max(1.0, best_cost/lower))
+            elif best_cost == 0:
+                bound = 1.0
+            if reported is None or (best_cost, bound) < reported:
+                reported = (best_cost, bound)
+                yield (_reconstruct(parents, best_id), best_cost, visited, expanded), bound
+            if bound <= 1:
+                return
+        if exhausted or weight <= 1 or not (open_nodes or inconsistent):
+            return
+        weight = max(1.0, weight - step)
+        open_nodes.update(inconsistent)
+        inconsistent = {}
+        closed = set()
+
+def one_to_many(start, goals, heuristics=None, k=None, candidates=None):
+    """
+    Shortest paths from start to many goals in a single search, instead of one astar call per goal.
+
+    goals is either a collection of goal node ids, or a goal predicate like the one passed to astar. In the latter case candidates can
+    enumerate the ids of all nodes that satisfy the predicate, which lets the search stop once all of them are found and use them
+    for the heuristic. Without it the search only stops after k goals were found or the graph is exhausted, so k is required on
+    infinite graphs.
+
+    heuristics gives a heuristic per goal: either a function that returns the heuristic function for a goal id (e.g.
+    landmarks.Landmarks.heuristic), or a table in the shape of graph.AustriaHeuristic. The search is A* with the minimum over the
+    goals that were not found yet as heuristic, which is admissible for each of them if the per-goal heuristics are. Whenever a goal
+    is found the minimum can only grow, so outdated frontier entries get their key recomputed when they are popped. Without
+    heuristics (or goals to take them from) the search is Dijkstra's algorithm. Nodes are reopened when a cheaper path to them
+    is found, since the changing heuristic is not consistent. A node with an infinite heuristic cannot reach any of the remaining 
+    goals (if the per-goal heuristics are admissible), so it is never put into the frontier. Note that every heuristic call evaluates
+    the per-goal heuristics of all remaining goals, so with many goals and cheap get_neighbors calls plain Dijkstra can be the faster
+    choice.
+
+    An empty goal set (or empty candidates) returns an empty result without searching.
+
+    Goals are found in the order of their distance, so with k only the k nearest goals are searched for. Returns a 3-tuple
+    (found,visited,expanded), where found is a dict that maps the id of every goal found, nearest first, to the pair (path,distance).
+    """
+    if callable(goals):
+        is_goal = goals
+        remaining = None if candidates is None else set(candidates)
+    else:
+        remaining = set(goals)
+        is_goal = lambda n: n.get_id() in remaining
+    if remaining is not None and not remaining:
+        return {}, 0, 0
+    if heuristics is None or remaining is None:
+        h = default_heuristic
+    else:
+        if isinstance(heuristics, dict):
+            per_goal = {t: (lambda row: lambda n: row.get(n.get_id(), 0))(heuristics[t]) for t in remaining}
+        else:
+            per_goal = {t: heuristics(t) for t in remaining}
+        def h(n):
+            return min([per_goal[t](n) for t in remaining], default=0)
+    inf = float("inf")
+    start_id = start.get_id()
+    parents = {start_id: None}
+    costs = {start_id: 0}
+    closed = {}
+    found = {}
+    generation = 0
+    counter = 0
+    key = h(start)
+    frontier = [(key, counter, 0, generation, start)] if key < inf else []
+    visited = 1
+    expanded = 0
+    while frontier:
+        key, _, cost, pushed, current = heappop(frontier)
+        current_id = current.get_id()
+        if cost > costs[current_id] or (current_id in closed and closed[current_id] <= cost):
+            continue
+        if pushed < generation:
+            new_key = cost + h(current)
+            if new_key > key:
+                if new_key < inf:
+                    counter += 1
+                    heappush(frontier, (new_key, counter, cost, generation, current))
+                continue
+        if current_id not in found and is_goal(current):
+            found[current_id] = (_reconstruct(parents, current_id), cost)
+            if remaining is not None:
+                remaining.discard(current_id)
+                generation += 1
+                if not remaining:
+                    break
+            if k is not None and len(found) >= k:
+                break
+        closed[current_id] = cost
+        expanded += 1
+        for edge in current.get_neighbors():
+            target = edge.target
+            target_id = target.get_id()
+            new_cost = cost + edge.cost
+            known = costs.get(target_id)
+            if known is not None and new_cost >= known:
+                continue
+            costs[target_id] = new_cost
+            parents[target_id] = (current_id, edge)
+            key = new_cost + h(target)
+            if key == inf:
+                continue
+            visited += 1
+            counter += 1
+            heappush(frontier, (key, counter, new_cost, generation, target))
+    return found, visited, expanded
+
+def run_all(name, start, heuristic, goal, parallel=False):
+    """
+    Runs all search algorithms, with the default and the given heuristic, and prints their results. If parallel is True the variants
+    run concurrently in worker processes (see batch.run_variants); the results are still printed in the usual order.
+    """
+    variants = [("Breadth-First Search", bfs, None),
+                ("Depth-First Search", dfs, None),
+                ("Greedy Search (default heuristic)", greedy, default_heuristic),
+                ("Greedy Search", greedy, heuristic),
+                ("A* Search (default heuristic)", astar, default_heuristic),
+                ("A* Search", astar, heuristic)]
+    print("running test", name)
+    if parallel:
+        import batch
+        results = {label: result for (label, result, seconds) in batch.run_variants(start, goal, variants)}
+    for (i, (label, algorithm, h)) in enumerate(variants):
+        print(label if i == 0 else "\n" + label)
+        if parallel:
+            result = results[label]
+        elif h is None:
+            result = algorithm(start, goal)
+        else:
+            result = algorithm(start, h, goal)
+        print_path(result)
 
     print("\n\n")
 
-def print_path(result):
+def print_path(result, stats=None):
     (path,cost,visited_cnt,expanded_cnt) = result
     print("visited nodes:", visited_cnt, "expanded nodes:",expanded_cnt)
+    if stats is not None:
+        print(stats.report())
     if path:
         print("Path found with cost", cost)
         for n in path:
@@ -0,0 +1,62 @@
+import json
+import time
+from heapq import heappush, heappop
+
+class SearchStats:
+    """
+    Opt-in instrumentation for the search functions in pathfinding.py: pass an instance as their stats argument. Without it the 
+    searches run unchanged, with it the goal predicate, the heuristic and get_neighbors are wrapped in timers and the frontier 
+    operations in counters.
+    
+    Recorded counters:
+        - calls and cumulative seconds for "goal", "heuristic" and "neighbors" (in the calls and seconds dictionaries)
+        - pushes and pops: frontier operations, including outdated entries skipped when popped
+        - peak_frontier: largest number of entries in the frontier at any time
+        - closed: size of the closed set when the search ended
+        - reopened: nodes whose cost improved after they were already in the frontier (A* decrease-key)
+    
+    One instance can be reused for several searches, the counters then add up (peak_frontier is the maximum).
+    """
+    def __init__(self):
+        self.calls = {"goal": 0, "heuristic": 0, "neighbors": 0}
+        self.seconds = {"goal": 0.0, "heuristic": 0.0, "neighbors": 0.0}
+        self.pushes = 0
+        self.pops = 0
+        self.peak_frontier = 0
+        self.closed = 0
+        self.reopened = 0
+    def timed(self, phase, f):
+        """
+        Wraps the function f so that its calls and run time are recorded under phase.
+        """
+        calls = self.calls
+        seconds = self.seconds
+        clock = time.perf_counter
+        def wrapper(*args):
+            began = clock()
+            result = f(*args)
+            seconds[phase] += clock() - began
+            calls[phase] += 1
+            return result
+        return wrapper
+    def push(self, frontier, entry):
+        heappush(frontier, entry)
+        self.pushes += 1
+        if len(frontier) > self.peak_frontier:
+            self.peak_frontier = len(frontier)
+    def pop(self, frontier):
+        self.pops += 1
+        return heappop(frontier)
+    def as_dict(self):
+        return {"calls": dict(self.calls), "seconds": dict(self.seconds), "pushes": self.pushes, "pops": self.pops, 
+                "peak_frontier": self.peak_frontier, "closed": self.closed, "reopened": self.reopened}
+    def to_json(self):
+        return json.dumps(self.as_dict())
+    def report(self):
+        """
+        Returns the counters as human readable text, as printed by pathfinding.print_path.
+        """
+        lines = ["%-10s %10d calls %10.6f s"%(phase, self.calls[phase], self.seconds[phase]) for phase in ("goal", "heuristic", "neighbors")]
+        lines.append("frontier: %d pushes, %d pops, peak size %d"%(self.pushes, self.pops, self.peak_frontier))
+        lines.append("closed set: %d nodes, reopened: %d"%(self.closed, self.reopened))
+        return "\n".join(lines)
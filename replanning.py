@@ -0,0 +1,124 @@
+from heapq import heappush, heappop
+
+import pathfinding
+
+class IncrementalPlanner:
+    """
+    Lifelong Planning A* (LPA*) between two fixed nodes of a finite graph whose edge costs change, e.g. the result of 
+    graph.make_geom_graph. 
+    
+    Every node keeps its cost g from the start and a one-step lookahead rhs (the best g of a predecessor plus the edge cost). Nodes 
+    where the two differ are inconsistent and sit in a priority queue ordered like A* (by min(g,rhs) + heuristic). After a batch of 
+    edge cost changes only the targets of the changed edges become inconsistent, and the search repairs g values starting from 
+    them, instead of searching from scratch. 
+    
+    The edge costs are read from the graph.Edge objects, update_edges() changes them in place.
+    """
+    def __init__(self, nodes, start_id, goal_id, heuristic=pathfinding.default_heuristic):
+        self.nodes = nodes
+        self.start_id = start_id
+        self.goal_id = goal_id
+        self.heuristic = heuristic
+        self.predecessors = {node_id: [] for node_id in nodes}
+        self.edges = {}
+        for (node_id, node) in nodes.items():
+            for edge in node.get_neighbors():
+                target_id = edge.target.get_id()
+                self.predecessors[target_id].append((node_id, edge))
+                self.edges.setdefault((node_id, target_id), []).append(edge)
+        self.g = {}
+        self.rhs = {start_id: 0}
+        self.queue = []
+        self.queued = {}
+        self.counter = 0
+        self.visited = 0
+        self.expanded = 0
+        self._push(start_id)
+    def _key(self, node_id):
+        best = min(self.g.get(node_id, float("inf")), self.rhs.get(node_id, float("inf")))
+        return (best + self.heuristic(self.nodes[node_id]), best)
+    def _push(self, node_id):
+        key = self._key(node_id)
+        self.queued[node_id] = key
+        self.counter += 1
+        self.visited += 1
+        heappush(self.queue, (key, self.counter, node_id))
+    def _update(self, node_id):
+        """
+        Recomputes rhs of a node from its predecessors and (re)queues it if it is inconsistent.
+        """
+        inf = float("inf")
+        if node_id != self.start_id:
+            g = self.g
+            self.rhs[node_id] = min([g.get(p, inf) + edge.cost for (p, edge) in self.predecessors[node_id]], default=inf)
+        self.queued.pop(node_id, None)
+        if self.g.get(node_id, inf) != self.rhs.get(node_id, inf):
+            self._push(node_id)
+    def _top(self):
+        while self.queue:
+            key, _, node_id = self.queue[0]
+            if self.queued.get(node_id) == key:
+                return key
+            heappop(self.queue)
+        return (float("inf"), float("inf"))
+    def _compute(self):
+        inf = float("inf")
+        g = self.g
+        rhs = self.rhs
+        goal_id = self.goal_id
+        while self._top() < self._key(goal_id) or rhs.get(goal_id, inf) != g.get(goal_id, inf):
+            if not self.queue:
+                break
+            _, _, node_id = heappop(self.queue)
+            del self.queued[node_id]
+            self.expanded += 1
+            successors = [edge.target.get_id() for edge in self.nodes[node_id].get_neighbors()]
+            if g.get(node_id, inf) > rhs.get(node_id, inf):
+                g[node_id] = rhs[node_id]
+            else:
+                g[node_id] = inf
+                self._update(node_id)
+            for target_id in successors:
+                self._update(target_id)
+    def _path(self):
+        inf = float("inf")
+        g = self.g
+        node_id = self.goal_id
+        if g.get(node_id, inf) == inf:
+            return []
+        path = []
+        while node_id != self.start_id:
+            (p, edge) = min(self.predecessors[node_id], key=lambda entry: g.get(entry[0], inf) + entry[1].cost)
+            path.append(edge)
+            node_id = p
+        path.reverse()
+        return path
+    def plan(self):
+        """
+        Brings the search up to date and returns the usual 4-tuple (path,distance,visited,expanded), where visited and expanded count 
+        the queue insertions and removals since the previous call.
+        """
+        self.visited = 0
+        self.expanded = 0
+        self._compute()
+        path = self._path()
+        return path, (self.g[self.goal_id] if path else 0), self.visited, self.expanded
+    def update_edges(self, changes, both_directions=True):
+        """
+        Applies a batch of edge cost changes, given as (from id, to id, new cost) triples, and returns the repaired result of plan().
+        With both_directions the reverse edge (as created by graph.make_geom_graph) gets the same cost.
+        """
+        self.visited = 0
+        self.expanded = 0
+        touched = set()
+        for (a, b, cost) in changes:
+            pairs = [(a, b), (b, a)] if both_directions else [(a, b)]
+            for (source_id, target_id) in pairs:
+                for edge in self.edges.get((source_id, target_id), []):
+                    edge.cost = cost
+                    touched.add(target_id)
+        for target_id in touched:
+            self._update(target_id)
+        visited = self.visited
+        path, distance, more_visited, expanded = self.plan()
+        return path, distance, visited + more_visited, expanded
@@ -0,0 +1,108 @@
+import numpy as np
+
+import graph
+
+class Bitmap:
+    """
+    Growable bitmap of visited integers. Numbers are mapped to bit positions with the zigzag encoding 0, -1, 1, -2, 2, ... so that 
+    negative numbers fit as well, and the underlying uint8 array at least doubles whenever a larger number is added.
+    """
+    def __init__(self, size=1 << 16):
+        self.bits = np.zeros(size >> 3, dtype=np.uint8)
+    @staticmethod
+    def _positions(values):
+        return np.where(values >= 0, values*2, -values*2 - 1)
+    def contains(self, values):
+        positions = self._positions(values)
+        result = np.zeros(len(values), dtype=bool)
+        inside = positions < len(self.bits)*8
+        p = positions[inside]
+        result[inside] = (self.bits[p >> 3] >> (p & 7).astype(np.uint8)) & 1 == 1
+        return result
+    def add(self, values):
+        positions = self._positions(values)
+        if len(positions) == 0:
+            return
+        needed = (int(positions.max()) >> 3) + 1
+        if needed > len(self.bits):
+            grown = np.zeros(max(needed, 2*len(self.bits)), dtype=np.uint8)
+            grown[:len(self.bits)] = self.bits
+            self.bits = grown
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+def vector_bfs(start, goal, node_class=graph.InfNode, limit=1 << 61, stats=None):
+    """
+    Level-synchronous Breadth-First search for graphs whose nodes are integers and whose edges are arithmetic, such as graph.InfNode.
+    Instead of expanding one Node object at a time, every level of the search is a NumPy int64 array: node_class.array_successors 
+    (see graph.InfNode) produces all successors of the level at once, already visited numbers are filtered with a Bitmap, and 
+    duplicates are removed with np.unique. For every level the parent index and the kind of edge of each number are kept, which 
+    is enough to rebuild the path.
+    
+    start is a node or an int. goal is a vectorized predicate: it is passed an int64 array and returns a boolean array, e.g.
+    lambda n: (n > 1000) & (n % 123 == 63) for the multigoal of pathfinding.main. Numbers with an absolute value above limit are 
+    not generated, which also keeps *2 from overflowing int64. Note that the Bitmap needs one bit per number up to the largest one 
+    visited, so limit also bounds its memory.
+    
+    stats is an optional profiling.SearchStats. Since a level is a whole array, it records one goal call per level, the numbers added
+    to and expanded from the levels as pushes and pops, and the size of the largest level as peak_frontier.
+    
+    Returns the same 4-tuple (path,distance,visited,expanded) as pathfinding.bfs, with the path made of graph.InfEdge objects.
+    """
+    if stats is not None:
+        goal = stats.timed("goal", goal)
+    number = start.get_id() if isinstance(start, graph.Node) else start
+    values = np.array([number], dtype=np.int64)
+    seen = Bitmap()
+    seen.add(values)
+    visited = 1
+    expanded = 0
+    if goal(values).any():
+        return [], 0, visited, expanded
+    levels = [(values, None, None, None)]
+    while len(values):
+        candidates = []
+        parents = []
+        kinds = []
+        successors = node_class.array_successors(values)
+        for (kind, (op, targets, valid)) in enumerate(successors):
+            index = np.arange(len(values)) if valid is None else np.flatnonzero(valid)
+            candidates.append(targets if valid is None else targets[index])
+            parents.append(index)
+            kinds.append(np.full(len(index), kind, dtype=np.int8))
+        names = [op for (op, _, _) in successors]
+        expanded += len(values)
+        candidates = np.concatenate(candidates)
+        parents = np.concatenate(parents)
+        kinds = np.concatenate(kinds)
+        keep = np.abs(candidates) <= limit
+        keep[keep] = ~seen.contains(candidates[keep])
+        candidates, first = np.unique(candidates[keep], return_index=True)
+        parents = parents[keep][first]
+        kinds = kinds[keep][first]
+        seen.add(candidates)
+        visited += len(candidates)
+        if stats is not None:
+            stats.pushes += len(candidates)
+            stats.pops += len(values)
+            stats.peak_frontier = max(stats.peak_frontier, len(candidates))
+        levels.append((candidates, parents, kinds, names))
+        hits = np.flatnonzero(goal(candidates))
+        if len(hits):
+            return _reconstruct(levels, int(hits[0]), node_class), len(levels) - 1, visited, expanded
+        values = candidates
+    return [], 0, visited, expanded
+
+def _reconstruct(levels, i, node_class):
+    """
+    Follows the parent indices from entry i of the last level back to the start and returns the path as graph.InfEdge objects.
+    """
+    path = []
+    for depth in range(len(levels) - 1, 0, -1):
+        values, parents, kinds, names = levels[depth]
+        dest = int(values[i])
+        op = names[kinds[i]]
+        i = int(parents[i])
+        source = int(levels[depth-1][0][i])
+        path.append(graph.InfEdge(node_class(dest), source, op, dest))
+    path.reverse()
+    return path